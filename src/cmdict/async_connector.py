@@ -0,0 +1,160 @@
+"""Database Connector for asyncio applications."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Union
+
+from cmdict.ecdict_connector import _PATH
+from cmdict.ecdict_connector import ECDICTConnector
+
+
+class AsyncECDICTConnector:
+    """ECDICT database Connector that does not block the event loop.
+
+    Queries are answered by a bounded pool of threads sharing one
+    ``ECDICTConnector``, which opens a read-only connection per thread.
+    Concurrent queries of the same word share one database lookup, run
+    in a task of its own. The lookup is only cancelled when no query is
+    waiting for it.
+
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = _PATH,
+        pool_size: int = 4,
+        **kwargs,
+    ):
+        """Initialize database Connector.
+
+        Args:
+            path: Path to the database file. Defaults to be ``stardict``.
+            pool_size: Maximum number of threads, so as connections.
+            **kwargs: other keyword arguments of ``ECDICTConnector``,
+                which validates the database file.
+        """
+        self._connector = ECDICTConnector(path, **kwargs)
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="cmdict"
+        )
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._batches: Dict[asyncio.Task, List[str]] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+
+    async def __aenter__(self):
+        """Enter the context.
+
+        Returns:
+            AsyncECDICTConnector: this connector.
+        """
+        return self
+
+    async def __aexit__(self, *args):
+        """Exit the context and release the pool of threads.
+
+        Args:
+            *args: exception details, if any.
+        """
+        self.close()
+
+    def close(self):
+        """Release the pool of threads after pending queries finish."""
+        self._executor.shutdown(wait=True)
+        self._connector.close()
+
+    async def query(self, word):
+        """Query word from the database.
+
+        Args:
+            word (str): the word to be queried.
+
+        Returns:
+            dict: Query result in the same format as
+                ``ECDICTConnector.query``, or None if it is not found.
+        """
+        return (await self.query_many([word]))[word]
+
+    async def query_many(self, words):
+        """Query several words from the database in batched statements.
+
+        Words that are being queried by other tasks are not queried
+        again, but share results of those tasks.
+
+        Args:
+            words (Iterable[str]): the words to be queried.
+
+        Returns:
+            dict: mapping from each distinct word, in the order of first
+                appearance, to its query result, or None if it is not
+                found.
+        """
+        words = list(dict.fromkeys(words))
+
+        missing = [w for w in words if w not in self._inflight]
+        if missing:
+            task = asyncio.get_running_loop().create_task(
+                self._lookup(missing)
+            )
+            self._batches[task] = missing
+            self._waiters[task] = 0
+            for word in missing:
+                self._inflight[word] = task
+
+        tasks = list(dict.fromkeys(self._inflight[w] for w in words))
+        for task in tasks:
+            self._waiters[task] += 1
+
+        res = {}
+        try:
+            for task in tasks:
+                # cancelling this query does not cancel the shared task
+                res.update(await asyncio.shield(task))
+        finally:
+            for task in tasks:
+                self._waiters[task] -= 1
+                if not self._waiters[task]:
+                    del self._waiters[task]
+                    if not task.done():
+                        self._release(task)
+                        task.cancel()
+        return {word: res[word] for word in words}
+
+    async def _lookup(self, words):
+        """Look words up in a thread of the pool.
+
+        Args:
+            words (list[str]): the words to be queried.
+
+        Returns:
+            dict: mapping from each word to its query result.
+        """
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._query_many, words
+            )
+        finally:
+            self._release(asyncio.current_task())
+
+    def _release(self, task):
+        """Stop sharing a lookup with new queries.
+
+        Args:
+            task (asyncio.Task): task of the lookup.
+        """
+        for word in self._batches.pop(task, ()):
+            if self._inflight.get(word) is task:
+                del self._inflight[word]
+
+    def _query_many(self, words):
+        """Query words in a thread of the pool.
+
+        Args:
+            words (list[str]): the words to be queried.
+
+        Returns:
+            dict: mapping from each word to its query result.
+        """
+        return self._connector.query_many(words)
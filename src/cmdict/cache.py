@@ -0,0 +1,296 @@
+"""Caches for query results."""
+import atexit
+import json
+import sqlite3
+import threading
+from collections import namedtuple
+from collections import OrderedDict
+
+from cmdict.utils import log_exception
+
+MISSING = object()
+"""Sentinel returned for keys that are not cached."""
+
+CacheInfo = namedtuple(
+    "CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"]
+)
+"""Statistics of a cache."""
+_CHUNK_SIZE = 500
+"""Maximum number of keys bound in one ``IN (...)`` statement."""
+_FLUSH_SIZE = 256
+"""Number of buffered values that triggers a write to the cache file."""
+
+
+class LRUCache:
+    """Bounded cache that evicts the least recently used key.
+
+    Values can be None, so that misses in the database can be cached
+    as well. ``MISSING`` is returned for keys that are not cached. It is
+    safe to use the cache from several threads.
+
+    """
+
+    def __init__(self, maxsize: int):
+        """Initialize the cache.
+
+        Args:
+            maxsize: maximum number of cached keys.
+
+        Raises:
+            ValueError: when the maximum size is not positive.
+        """
+        if maxsize <= 0:
+            raise ValueError(f"Cache size {maxsize} is not positive.")
+
+        self._maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self):
+        """Return the number of cached keys.
+
+        Returns:
+            int: the number of cached keys.
+        """
+        return len(self._data)
+
+    def get(self, key):
+        """Get the cached value of a key and mark it as recently used.
+
+        Args:
+            key (Hashable): the key.
+
+        Returns:
+            object: the cached value, or ``MISSING`` if it is not cached.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return MISSING
+
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key, value):
+        """Cache the value of a key, evicting the least recently used.
+
+        Args:
+            key (Hashable): the key.
+            value (object): the value.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def info(self):
+        """Return statistics of the cache.
+
+        Returns:
+            CacheInfo: hits, misses, evictions, maximum and current size.
+        """
+        return CacheInfo(
+            self._hits,
+            self._misses,
+            self._evictions,
+            self._maxsize,
+            len(self._data),
+        )
+
+
+class PersistentCache:
+    """Cache of query results in a SQLite file shared across processes.
+
+    The cache belongs to one version of the database, identified by its
+    fingerprint. When the fingerprint changes, for example after the
+    database is downloaded again, all cached results are dropped. When
+    there are more than ``maxsize`` keys, the least recently used ones
+    are evicted. New values and hits are buffered in memory, and written
+    in one transaction when enough values are buffered, or when the
+    cache is flushed or closed, so neither reads nor single updates
+    write the file. Buffers are flushed when Python exits. It is safe to
+    use the cache from several threads.
+
+    """
+
+    def __init__(self, path, fingerprint: str, maxsize: int):
+        """Open the cache file, creating it if necessary.
+
+        Args:
+            path (str, Path): to the cache file.
+            fingerprint: of the database whose results are cached.
+            maxsize: maximum number of cached keys.
+
+        Raises:
+            ValueError: when the maximum size is not positive.
+        """
+        if maxsize <= 0:
+            raise ValueError(f"Cache size {maxsize} is not positive.")
+
+        self._maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._touched = {}
+        self._pending = {}
+
+        self._lock = threading.Lock()
+        # the connection is shared by threads, guarded by the lock
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "create table if not exists meta "
+                "(key text primary key, value text)"
+            )
+            self._conn.execute(
+                "create table if not exists entries "
+                "(key text primary key, value text, used integer not null)"
+            )
+            self._conn.execute(
+                "create index if not exists entries_used on entries (used)"
+            )
+
+            row = self._conn.execute(
+                "select value from meta where key = 'fingerprint'"
+            ).fetchone()
+            if row is None or row[0] != fingerprint:
+                self._conn.execute("delete from entries")
+                self._conn.execute(
+                    "insert or replace into meta values ('fingerprint', ?)",
+                    (fingerprint,),
+                )
+
+        self._count, self._clock = self._conn.execute(
+            "select count(*), coalesce(max(used), 0) from entries"
+        ).fetchone()
+        atexit.register(self.flush)
+
+    def get_many(self, keys):
+        """Get cached values of keys and mark them as recently used.
+
+        Args:
+            keys (list[str]): the keys.
+
+        Returns:
+            dict: cached values of keys that are found.
+        """
+        res = {}
+        with self._lock:
+            res.update(
+                (k, json.loads(self._pending[k]))
+                for k in keys
+                if k in self._pending
+            )
+            stored = [k for k in keys if k not in res]
+            try:
+                for start in range(0, len(stored), _CHUNK_SIZE):
+                    stop = start + _CHUNK_SIZE
+                    chunk = stored[start:stop]
+                    query = "select key, value from entries where key in ({})"
+                    rows = self._conn.execute(
+                        query.format(", ".join("?" * len(chunk))), chunk
+                    )
+                    res.update((k, json.loads(v)) for k, v in rows)
+            except sqlite3.Error:
+                log_exception("SQLite cache search failed.")
+
+            if res:
+                self._clock += 1
+                self._touched.update(dict.fromkeys(res, self._clock))
+
+            self._hits += len(res)
+            self._misses += len(keys) - len(res)
+        return res
+
+    def put_many(self, items):
+        """Cache values of keys, which are written in batches.
+
+        Args:
+            items (dict): values of keys.
+        """
+        with self._lock:
+            self._pending.update(
+                (k, json.dumps(v, ensure_ascii=False))
+                for k, v in items.items()
+            )
+            if len(self._pending) >= _FLUSH_SIZE:
+                self._write()
+
+    def flush(self):
+        """Write buffered values and hits to the file."""
+        with self._lock:
+            self._write()
+
+    def close(self):
+        """Flush and close the cache file."""
+        with self._lock:
+            self._write()
+            self._conn.close()
+        atexit.unregister(self.flush)
+
+    def _write(self):
+        """Write buffered values and hits, evicting the least recently used.
+
+        The number of keys is kept in memory, only new keys are counted
+        in the file, instead of counting all of its keys.
+        """
+        if not self._pending and not self._touched:
+            return
+
+        self._clock += 1
+        pending, self._pending = self._pending, {}
+        try:
+            with self._conn:
+                if self._touched:
+                    self._conn.executemany(
+                        "update entries set used = ? where key = ?",
+                        ((clock, k) for k, clock in self._touched.items()),
+                    )
+                    self._touched = {}
+
+                keys = list(pending)
+                for start in range(0, len(keys), _CHUNK_SIZE):
+                    stop = start + _CHUNK_SIZE
+                    chunk = keys[start:stop]
+                    query = "select count(*) from entries where key in ({})"
+                    self._count -= self._conn.execute(
+                        query.format(", ".join("?" * len(chunk))), chunk
+                    ).fetchone()[0]
+                self._conn.executemany(
+                    "insert or replace into entries values (?, ?, ?)",
+                    ((k, v, self._clock) for k, v in pending.items()),
+                )
+                self._count += len(pending)
+
+                if self._count > self._maxsize:
+                    cursor = self._conn.execute(
+                        "delete from entries where key in "
+                        "(select key from entries order by used limit ?)",
+                        (self._count - self._maxsize,),
+                    )
+                    self._evictions += cursor.rowcount
+                    self._count -= cursor.rowcount
+        except sqlite3.Error:
+            log_exception("SQLite cache update failed.")
+
+    def info(self):
+        """Return statistics of the cache in this process.
+
+        Returns:
+            CacheInfo: hits, misses, evictions, maximum and current size.
+        """
+        return CacheInfo(
+            self._hits,
+            self._misses,
+            self._evictions,
+            self._maxsize,
+            self._count,
+        )
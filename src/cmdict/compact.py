@@ -0,0 +1,408 @@
+"""Compact read-only dictionary format opened by memory map.
+
+The file starts with a header, followed by a table of value types, a
+table of offsets, and a blob of all values encoded in UTF-8::
+
+    header | types: uint32 * count | offsets: uint32 * (count * F + 1) | blob
+
+Records are sorted by their ``word`` in lowercase ASCII, which is the
+``NOCASE`` order of SQLite, so a word is found by binary search. Field
+``j`` of record ``i`` is ``blob[offsets[i * F + j]:offsets[i * F + j + 1]]``
+and its type is bits ``2j`` and ``2j + 1`` of ``types[i]``.
+"""
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Optional
+from typing import Union
+
+from cmdict.ecdict_connector import _HISTORY
+from cmdict.ecdict_connector import _KEY_NAMES
+from cmdict.ecdict_connector import _projection
+from cmdict.history import get_store
+from cmdict.utils import fingerprint
+
+_PATH = Path(__file__).parent / "data" / "stardict.cdb"
+_MAGIC = b"CMDICTCD"
+_VERSION = 1
+_HEADER = struct.Struct("<8sBBHI32sQQ")
+"""Magic, version, byte order, fields, records, fingerprint, positions."""
+_BYTE_ORDERS = ("little", "big")
+_NONE, _STR, _INT, _FLOAT = range(4)
+"""Types of values, encoded in 2 bits."""
+_DECODERS = (
+    lambda b: None,
+    lambda b: str(b, "utf-8"),
+    int,
+    float,
+)
+_FIELDS = _projection()
+"""Index of each field in a record."""
+_WORD = _FIELDS["word"]
+_MAX_OFFSET = (1 << 32) - 1
+"""Maximum offset in the blob, stored in 32 bits."""
+
+
+def compile_db(db_path, path=_PATH):
+    """Convert an ECDICT SQLite database into the compact format.
+
+    The file is written beside the compact file, which is replaced only
+    when the file is complete, so it is never read half written.
+
+    Args:
+        db_path (str, Path): to the SQLite database file.
+        path (str, Path): to the compact file to be written.
+
+    Raises:
+        ValueError: when words are not unique in lowercase, or the
+            database is too large for the format.
+    """
+    n_fields = len(_KEY_NAMES)
+    path = Path(path)
+    conn = sqlite3.connect(
+        Path(db_path).resolve().as_uri() + "?mode=ro", uri=True
+    )
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    done = False
+    try:
+        count = conn.execute("select count(*) from stardict").fetchone()[0]
+        types = array("I", bytes(4 * count))
+        offsets = array("I", [0])
+        blob_pos = _HEADER.size + 4 * count + 4 * (count * n_fields + 1)
+
+        with open(tmp, "wb") as f:
+            f.seek(blob_pos)
+            size = 0
+            last_key = None
+            rows = conn.execute("select * from stardict order by word")
+            for i, row in enumerate(rows):
+                key = row[_WORD].encode("utf-8").lower()
+                if last_key is not None and key <= last_key:
+                    raise ValueError(
+                        f'Word "{row[_WORD]}" is duplicated or out of order.'
+                    )
+                last_key = key
+
+                mask = 0
+                for j, value in enumerate(row[:n_fields]):
+                    kind, data = _encode(value)
+                    mask |= kind << (2 * j)
+                    f.write(data)
+                    size += len(data)
+                    if size > _MAX_OFFSET:
+                        raise ValueError(
+                            "Database is too large to be compiled, with "
+                            f"more than {_MAX_OFFSET} bytes of values."
+                        )
+                    offsets.append(size)
+                types[i] = mask
+
+            f.seek(0)
+            f.write(
+                _HEADER.pack(
+                    _MAGIC,
+                    _VERSION,
+                    _BYTE_ORDERS.index(sys.byteorder),
+                    n_fields,
+                    count,
+                    fingerprint(db_path).encode("ascii"),
+                    _HEADER.size + 4 * count,
+                    blob_pos,
+                )
+            )
+            types.tofile(f)
+            offsets.tofile(f)
+        os.replace(tmp, path)
+        done = True
+    finally:
+        conn.close()
+        if not done:
+            tmp.unlink(missing_ok=True)
+
+
+def _encode(value):
+    """Encode a value of the database.
+
+    Args:
+        value (object): the value.
+
+    Returns:
+        tuple: type of the value, and the value in bytes.
+    """
+    if value is None:
+        return _NONE, b""
+    elif isinstance(value, int):
+        return _INT, str(value).encode("ascii")
+    elif isinstance(value, float):
+        return _FLOAT, repr(value).encode("ascii")
+    else:
+        return _STR, str(value).encode("utf-8")
+
+
+class CompactEntry(Mapping):
+    """Query result that decodes fields only when they are accessed.
+
+    It has the same keys and values as the result returned by
+    ``ECDICTConnector.query``.
+
+    """
+
+    __slots__ = ("_dictionary", "_index", "_positions")
+
+    def __init__(self, dictionary, index, positions=None):
+        """Initialize the query result.
+
+        Args:
+            dictionary (CompactDictionary): where the record is.
+            index (int): index of the record.
+            positions (dict, None): projection of fields, see
+                ``_projection``, or None for all fields.
+        """
+        self._dictionary = dictionary
+        self._index = index
+        self._positions = _FIELDS if positions is None else positions
+
+    def __getitem__(self, key):
+        """Decode the value of a field.
+
+        Args:
+            key (str): name of the field.
+
+        Returns:
+            object: the value.
+
+        Raises:
+            KeyError: when there is no such field.
+        """
+        if key not in self._positions:
+            raise KeyError(key)
+        return self._dictionary.field(self._index, _FIELDS[key])
+
+    def __iter__(self):
+        """Iterate names of fields.
+
+        Returns:
+            Iterator[str]: names of fields.
+        """
+        return iter(self._positions)
+
+    def __len__(self):
+        """Return the number of fields.
+
+        Returns:
+            int: the number of fields.
+        """
+        return len(self._positions)
+
+    def __repr__(self):
+        """Represent the query result like a dict.
+
+        Returns:
+            str: representation of the query result.
+        """
+        return repr(dict(self))
+
+
+class CompactDictionary:
+    """Compact dictionary file opened by memory map.
+
+    The file is shared through the page cache by all processes opening
+    it, and nothing is decoded until a field is accessed.
+
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = _PATH):
+        """Open the compact file.
+
+        Args:
+            path: Path to the compact file.
+
+        Raises:
+            ValueError: When the compact file is missing or invalid.
+        """
+        _path = Path(path)
+        if not _path.is_file():
+            raise ValueError(f'Compact file at "{_path}" is missing.')
+
+        with open(_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            version,
+            byte_order,
+            self._n_fields,
+            self._count,
+            source,
+            offsets_pos,
+            blob_pos,
+        ) = _HEADER.unpack_from(self._mmap)
+        if (
+            magic != _MAGIC
+            or version != _VERSION
+            or _BYTE_ORDERS[byte_order] != sys.byteorder
+            or self._n_fields != len(_KEY_NAMES)
+        ):
+            self.close()
+            raise ValueError(
+                f'Compact file at "{_path}" is invalid, please compile again.'
+            )
+
+        self.source = source.rstrip(b"\0").decode("ascii")
+        """Fingerprint of the database that the file is compiled from."""
+
+        view = memoryview(self._mmap)
+        types_pos = _HEADER.size
+        self._types = view[types_pos:offsets_pos].cast("I")
+        self._offsets = view[offsets_pos:blob_pos].cast("I")
+        self._blob = view[blob_pos:]
+
+    def __len__(self):
+        """Return the number of records.
+
+        Returns:
+            int: the number of records.
+        """
+        return self._count
+
+    def close(self):
+        """Release the memory map."""
+        for name in ("_types", "_offsets", "_blob"):
+            if hasattr(self, name):
+                getattr(self, name).release()
+        self._mmap.close()
+
+    def find(self, word):
+        """Find the index of a record by binary search.
+
+        Args:
+            word (str): the word, which is case insensitive for ASCII.
+
+        Returns:
+            int: index of the record, or None if it is not found.
+        """
+        key = word.encode("utf-8").lower()
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = self._raw(mid, _WORD).tobytes().lower()
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def field(self, index, j):
+        """Decode field ``j`` of a record.
+
+        Args:
+            index (int): index of the record.
+            j (int): index of the field.
+
+        Returns:
+            object: the value.
+        """
+        kind = (self._types[index] >> (2 * j)) & 3
+        return _DECODERS[kind](self._raw(index, j))
+
+    def _raw(self, index, j):
+        """Return bytes of field ``j`` of a record without copying.
+
+        Args:
+            index (int): index of the record.
+            j (int): index of the field.
+
+        Returns:
+            memoryview: bytes of the value.
+        """
+        k = index * self._n_fields + j
+        start, stop = self._offsets[k], self._offsets[k + 1]
+        return self._blob[start:stop]
+
+
+class CompactConnector:
+    """Connector with the same queries as ``ECDICTConnector``.
+
+    It looks words up in a compact file compiled by ``compile_db``.
+
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = _PATH):
+        """Initialize the connector.
+
+        Args:
+            path: Path to the compact file. Defaults to be ``stardict``.
+        """
+        self._dictionary = CompactDictionary(path)
+
+    @property
+    def source(self):
+        """Fingerprint of the database that the file is compiled from.
+
+        Returns:
+            str: the fingerprint.
+        """
+        return self._dictionary.source
+
+    def close(self):
+        """Release the compact file."""
+        self._dictionary.close()
+
+    def query(self, word, normalize=False, fields=None):
+        """Query word from the compact file.
+
+        Args:
+            word (str): the word to be queried.
+            normalize (bool): not supported by the compact file.
+            fields (Iterable[str], None): names of fields in the result,
+                where ``word`` is always included, or None for all.
+
+        Returns:
+            CompactEntry: Query result with the same keys and values as
+                ``ECDICTConnector.query``, or None if it is not found.
+        """
+        return self.query_many([word], normalize, fields)[word]
+
+    def query_many(self, words, normalize=False, fields=None):
+        """Query several words from the compact file.
+
+        Args:
+            words (Iterable[str]): the words to be queried.
+            normalize (bool): not supported by the compact file.
+            fields (Iterable[str], None): names of fields in the result,
+                where ``word`` is always included, or None for all.
+
+        Returns:
+            dict: mapping from each distinct word, in the order of first
+                appearance, to its query result, or None if it is not
+                found.
+
+        Raises:
+            ValueError: when normalized lookup is requested, which needs
+                the index of the database, or a field is unknown.
+        """
+        if normalize:
+            raise ValueError("Normalized lookup needs the database.")
+        positions = _projection(fields)
+
+        words = list(dict.fromkeys(words))
+
+        if _HISTORY:
+            get_store().record_many(words)
+
+        res = {}
+        for word in words:
+            index = self._dictionary.find(word)
+            res[word] = (
+                None
+                if index is None
+                else CompactEntry(self._dictionary, index, positions)
+            )
+        return res
@@ -0,0 +1,89 @@
+"""Prefix completion of headwords, ranked by frequency.
+
+Headwords with a rank are copied into a small table, so that all of them
+starting with a prefix can be ranked within an interactive latency.
+Other headwords only fill up the remaining slots in alphabetical order,
+by a range scan on the index of the database. The table is built when
+the database is prepared, and completion is only alphabetical without
+it, since building it scans the whole database.
+"""
+
+
+def build_ranked_index(conn):
+    """Build a table of headwords with a frequency or BNC rank.
+
+    Args:
+        conn (sqlite3.Connection): to the index file, where the database
+            is attached as ``src``.
+    """
+    conn.execute(
+        "create table ranked "
+        "(word text primary key collate nocase, frq integer, bnc integer) "
+        "without rowid"
+    )
+    conn.execute(
+        "insert into ranked select word, frq, bnc from src.stardict "
+        "where frq > 0 or bnc > 0"
+    )
+
+
+def complete(index, prefix, limit=10, ranked=True):
+    """Complete a prefix into headwords.
+
+    Args:
+        index (IndexDB): index file.
+        prefix (str): the prefix, which is case insensitive for ASCII.
+        limit (int): maximum number of headwords.
+        ranked (bool): if the index file has the table of ranked
+            headwords.
+
+    Returns:
+        list[str]: headwords with a rank, ranked by frequency, then BNC
+            rank, followed by other headwords in alphabetical order.
+    """
+    if not prefix or limit <= 0:
+        return []
+
+    lower = "".join(c.lower() if c.isascii() else c for c in prefix)
+    upper = _upper_bound(lower)
+    where = "word >= ?" if upper is None else "word >= ? and word < ?"
+    bounds = (lower,) if upper is None else (lower, upper)
+
+    res = []
+    if ranked:
+        rows = index.execute(
+            f"select word from ranked where {where} order by "
+            "coalesce(frq, 0) = 0, frq, coalesce(bnc, 0) = 0, bnc, word "
+            "limit ?",
+            bounds + (limit,),
+        )
+        res = [w for (w,) in rows]
+    if len(res) < limit:
+        rows = index.execute(
+            f"select word from src.stardict where {where} order by word "
+            "limit ?",
+            bounds + (limit,),
+        )
+        ranked = set(res)
+        res += [w for (w,) in rows if w not in ranked]
+    return res[:limit]
+
+
+def _upper_bound(prefix):
+    """Return the least string greater than all strings with a prefix.
+
+    Args:
+        prefix (str): the prefix.
+
+    Returns:
+        str: the upper bound, or None if there is none.
+    """
+    prefix = prefix.rstrip(chr(0x10FFFF))
+    if not prefix:
+        return None
+
+    last = ord(prefix[-1]) + 1
+    if 0xD800 <= last <= 0xDFFF:
+        # surrogates can not be encoded in UTF-8
+        last = 0xE000
+    return prefix[:-1] + chr(last)
@@ -0,0 +1,216 @@
+"""Query daemon that keeps the database connector warm.
+
+The daemon listens on a Unix domain socket. Each request and response is
+one line of JSON, where a request is ``{"words": [...]}``, optionally with
+``"fields": [...]`` to be fetched, and a response is ``{"results": [...]}``
+in the same order as requested words.
+"""
+import json
+import os
+import socket
+import socketserver
+
+from cmdict.history import flush_all
+
+DAEMON_FEATURES = hasattr(socket, "AF_UNIX")
+"""If Unix domain sockets are supported on this platform."""
+
+SOCKET_PATH = os.getenv(
+    "CMDICT_SOCKET",
+    os.path.join(
+        os.getenv("TMPDIR", "/tmp"),
+        f"cmdict-{os.getuid()}.sock" if DAEMON_FEATURES else "cmdict.sock",
+    ),
+)
+"""Path to the socket, which can be set by an env var ``CMDICT_SOCKET``.
+
+It is not in the data folder, whose path may be too long for a socket.
+"""
+
+_TIMEOUT = 5.0
+"""Seconds to wait for the daemon, before falling back to the process."""
+
+
+class _QueryHandler(socketserver.StreamRequestHandler):
+    """Answer queries from one client until it disconnects."""
+
+    def handle(self):
+        """Answer each line of request with a line of response."""
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                words = request["words"]
+                res = self.server.connector.query_many(
+                    words, fields=request.get("fields")
+                )
+                response = {
+                    "results": [
+                        None if res[w] is None else dict(res[w]) for w in words
+                    ]
+                }
+            except Exception as exc:
+                response = {"error": repr(exc)}
+
+            # history is buffered in the daemon, which may never exit
+            flush_all()
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class _QueryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serve each client in its own thread."""
+
+    daemon_threads = True
+
+
+def serve(connector, path=SOCKET_PATH):
+    """Serve queries on a Unix domain socket until interrupted.
+
+    Args:
+        connector (ECDICTConnector): to answer queries.
+        path (str): to the socket.
+    """
+    with make_server(connector, path) as server:
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(path)
+
+
+def make_server(connector, path=SOCKET_PATH):
+    """Bind a server to a Unix domain socket.
+
+    A socket left by a daemon that is not running anymore is replaced.
+
+    Args:
+        connector (ECDICTConnector): to answer queries.
+        path (str): to the socket.
+
+    Returns:
+        socketserver.UnixStreamServer: server bound to the socket, which
+            serves each client in its own thread.
+
+    Raises:
+        RuntimeError: when another daemon is running on the socket.
+    """
+    if os.path.exists(path):
+        if query_many([], path) is not None:
+            raise RuntimeError(f'A daemon is running on "{path}".')
+        os.unlink(path)
+
+    server = _QueryServer(path, _QueryHandler)
+    server.connector = connector
+    return server
+
+
+class Client:
+    """Connection to the daemon, reused by several queries."""
+
+    def __init__(self, path=SOCKET_PATH, timeout=_TIMEOUT):
+        """Prepare the client, which connects at the first query.
+
+        Args:
+            path (str): to the socket.
+            timeout (float): seconds to wait for the daemon.
+        """
+        self._path = path
+        self._timeout = timeout
+        self._socket = None
+        self._file = None
+
+    def __enter__(self):
+        """Start using the client.
+
+        Returns:
+            Client: the client.
+        """
+        return self
+
+    def __exit__(self, *args):
+        """Close the connection.
+
+        Args:
+            *args: exception, if any.
+        """
+        self.close()
+
+    def close(self):
+        """Close the connection, if it is open."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def query_many(self, words, fields=None):
+        """Query several words from the daemon.
+
+        Args:
+            words (Iterable[str]): the words to be queried.
+            fields (Iterable[str], None): names of fields to be fetched,
+                or None for all.
+
+        Returns:
+            dict: mapping from each distinct word to its query result
+                like ``ECDICTConnector.query_many``, or None if no
+                daemon owned by the current user is running.
+        """
+        if not DAEMON_FEATURES:
+            return None
+
+        words = list(dict.fromkeys(words))
+        request = {"words": words}
+        if fields is not None:
+            request["fields"] = list(fields)
+        request = json.dumps(request).encode("utf-8") + b"\n"
+
+        try:
+            if self._socket is None:
+                self._connect()
+            self._socket.sendall(request)
+            response = json.loads(self._file.readline())
+        except (OSError, ValueError):
+            self.close()
+            return None
+
+        if "results" not in response:
+            return None
+        return dict(zip(words, response["results"]))
+
+    def _connect(self):
+        """Connect to the daemon owned by the current user.
+
+        Raises:
+            OSError: when the daemon can not be connected.
+            PermissionError: when the socket is owned by another user.
+        """
+        if os.stat(self._path).st_uid != os.getuid():
+            raise PermissionError(f'"{self._path}" is not owned by you.')
+
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._socket.settimeout(self._timeout)
+            self._socket.connect(self._path)
+            self._file = self._socket.makefile("rb")
+        except OSError:
+            self.close()
+            raise
+
+
+def query_many(words, path=SOCKET_PATH, timeout=_TIMEOUT, fields=None):
+    """Query several words from the daemon in one connection.
+
+    Args:
+        words (Iterable[str]): the words to be queried.
+        path (str): to the socket.
+        timeout (float): seconds to wait for the daemon.
+        fields (Iterable[str], None): names of fields to be fetched, or
+            None for all.
+
+    Returns:
+        dict: mapping from each distinct word to its query result like
+            ``ECDICTConnector.query_many``, or None if no daemon owned
+            by the current user is running.
+    """
+    with Client(path, timeout) as client:
+        return client.query_many(words, fields)
@@ -0,0 +1,444 @@
+"""Resumable download of the database in a zip file.
+
+By default, the zip file is streamed, and the database member is
+inflated to disk while it is downloaded, so no copy of the zip file is
+written. A broken connection is resumed by a HTTP Range request, from
+the last byte received. With several jobs, ranges of the zip file are
+downloaded in parallel into a preallocated file instead, whose finished
+ranges are kept in a JSON file, so an interrupted download resumes in
+the next run. Either way, the database is written to a ``.part`` file,
+verified by its CRC-32 in the zip file, and renamed in the end.
+"""
+import hashlib
+import json
+import os
+import shutil
+import struct
+import threading
+import zlib
+from pathlib import Path
+
+_MEMBER = "stardict.db"
+"""Name of the database in the zip file."""
+_BUFFER_SIZE = 1 << 20
+"""Bytes read or written at a time."""
+_RANGE_SIZE = 8 << 20
+"""Bytes in each range downloaded in parallel."""
+_RETRIES = 5
+"""Attempts for each request, before the download fails."""
+_TIMEOUT = 30
+"""Seconds to wait for the server."""
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+"""Local file header of a member in a zip file."""
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+_ENCRYPTED = 0x01
+_HAS_DESCRIPTOR = 0x08
+_STORED = 0
+_DEFLATED = 8
+
+
+def download(url, path, sha256=None, jobs=1, progress=None):
+    """Download a zip file and extract its database.
+
+    Args:
+        url (str): of the zip file.
+        path (str, Path): to the database to be written.
+        sha256 (str, None): expected SHA-256 of the zip file in hex.
+        jobs (int): number of ranges downloaded in parallel, where 1
+            means the zip file is streamed instead.
+        progress (Callable[[int, int], None]): called with the number
+            of bytes downloaded so far, and the size of the zip file if
+            it is known.
+
+    Raises:
+        ValueError: when the zip file is not as expected.
+    """
+    path = Path(path)
+    part = path.with_name(path.name + ".part")
+
+    if jobs > 1:
+        archive = path.with_name(path.stem + ".zip")
+        _download_ranges(url, archive, jobs, progress)
+        if sha256 and _hash_file(archive) != sha256.lower():
+            archive.unlink()
+            raise ValueError(f'SHA-256 of "{url}" does not match.')
+
+        _extract_member(archive, part)
+        archive.unlink()
+    else:
+        stream = _HTTPStream(url, progress)
+        done = False
+        try:
+            _inflate_member(stream, part)
+            if sha256:
+                while stream.read(_BUFFER_SIZE):
+                    pass
+                if stream.sha256.hexdigest() != sha256.lower():
+                    raise ValueError(f'SHA-256 of "{url}" does not match.')
+            done = True
+        finally:
+            stream.close()
+            if not done and part.is_file():
+                part.unlink()
+
+    os.replace(part, path)
+
+
+class _HTTPStream:
+    """Stream of a HTTP response, resumed by Range requests."""
+
+    def __init__(self, url, progress=None):
+        """Prepare the stream, which is requested at the first read.
+
+        Args:
+            url (str): to be downloaded.
+            progress (Callable[[int, int], None]): called with the number
+                of bytes received so far, and the total if it is known.
+        """
+        import requests
+
+        self.sha256 = hashlib.sha256()
+        """Hash of all bytes received."""
+
+        self._url = url
+        self._progress = progress
+        self._session = requests.Session()
+        self._response = None
+        self._chunks = None
+        self._buffer = bytearray()
+        self._received = 0
+        self._total = None
+
+    def close(self):
+        """Close the connection."""
+        if self._response is not None:
+            self._response.close()
+        self._session.close()
+
+    def read(self, n):
+        """Read bytes, reconnecting after the last byte received.
+
+        Args:
+            n (int): number of bytes.
+
+        Returns:
+            bytes: exactly ``n`` bytes, unless the stream ends.
+
+        Raises:
+            requests.RequestException: when the server fails too many
+                times.
+        """
+        import requests
+
+        failures = 0
+        while len(self._buffer) < n:
+            try:
+                if self._chunks is None:
+                    self._connect()
+                chunk = next(self._chunks, b"")
+            except requests.RequestException:
+                failures += 1
+                self._chunks = None
+                if failures >= _RETRIES:
+                    raise
+                continue
+
+            if not chunk:
+                break
+            failures = 0
+            self._buffer += chunk
+            self._received += len(chunk)
+            self.sha256.update(chunk)
+            if self._progress is not None:
+                self._progress(self._received, self._total)
+
+        data = bytes(self._buffer[:n])
+        del self._buffer[:n]
+        return data
+
+    def unread(self, data):
+        """Put bytes back to be read again.
+
+        Args:
+            data (bytes): the bytes read last.
+        """
+        self._buffer[:0] = data
+
+    def _connect(self):
+        """Request the rest of the stream after the last byte received."""
+        if self._response is not None:
+            self._response.close()
+
+        headers = {}
+        if self._received:
+            headers["Range"] = f"bytes={self._received}-"
+        self._response = self._session.get(
+            self._url, headers=headers, stream=True, timeout=_TIMEOUT
+        )
+        self._response.raise_for_status()
+        self._chunks = self._response.iter_content(_BUFFER_SIZE)
+
+        length = self._response.headers.get("content-length")
+        if self._response.status_code == 206:
+            if length is not None and self._total is None:
+                self._total = self._received + int(length)
+            return
+
+        # the server ignores Range, so received bytes are skipped
+        if length is not None:
+            self._total = int(length)
+        skip = self._received
+        while skip > 0:
+            chunk = next(self._chunks, b"")
+            if not chunk:
+                break
+            if len(chunk) > skip:
+                self._chunks = _prepend(chunk[skip:], self._chunks)
+            skip -= len(chunk)
+
+
+def _prepend(first, chunks):
+    """Yield a chunk before other chunks.
+
+    Args:
+        first (bytes): the first chunk.
+        chunks (Iterator[bytes]): other chunks.
+
+    Yields:
+        bytes: the chunks.
+    """
+    yield first
+    yield from chunks
+
+
+def _inflate_member(stream, path):
+    """Inflate the database from a stream of a zip file to disk.
+
+    Members before the database are skipped, by their sizes or by
+    inflating them, so that the zip file is read only once in order.
+
+    Args:
+        stream (_HTTPStream): stream of the zip file.
+        path (Path): to the database to be written.
+
+    Raises:
+        ValueError: when the database is not found, or it is broken.
+    """
+    while True:
+        header = stream.read(_LOCAL_HEADER.size)
+        if len(header) < _LOCAL_HEADER.size or header[:4] != _LOCAL_SIGNATURE:
+            raise ValueError(f'"{_MEMBER}" is not found in the zip file.')
+
+        fields = _LOCAL_HEADER.unpack(header)
+        flags, method, crc, size = fields[2], fields[3], fields[6], fields[7]
+        name = stream.read(fields[9]).decode("utf-8", "replace")
+        stream.read(fields[10])
+        if flags & _ENCRYPTED:
+            raise ValueError(f'"{name}" in the zip file is encrypted.')
+
+        is_member = name.rsplit("/", 1)[-1] == _MEMBER
+        with open(path, "wb") if is_member else _Discard() as f:
+            actual = _inflate(stream, method, size, flags, f)
+
+        if flags & _HAS_DESCRIPTOR:
+            descriptor = stream.read(4)
+            if descriptor == _DESCRIPTOR_SIGNATURE:
+                descriptor = stream.read(4)
+            crc = struct.unpack("<I", descriptor)[0]
+            stream.read(8)
+
+        if is_member:
+            if actual != crc:
+                raise ValueError(f'"{_MEMBER}" in the zip file is broken.')
+            return
+
+
+def _inflate(stream, method, size, flags, f):
+    """Inflate a member from a stream of a zip file.
+
+    Args:
+        stream (_HTTPStream): stream positioned at the member data.
+        method (int): compression method of the member.
+        size (int): compressed size of the member.
+        flags (int): general purpose flags of the member.
+        f (BinaryIO): where the member is written.
+
+    Returns:
+        int: CRC-32 of the member.
+
+    Raises:
+        ValueError: when the member can not be inflated.
+    """
+    crc = 0
+    if method == _STORED and not flags & _HAS_DESCRIPTOR:
+        while size > 0:
+            data = stream.read(min(size, _BUFFER_SIZE))
+            if not data:
+                raise ValueError("The zip file is truncated.")
+            size -= len(data)
+            crc = zlib.crc32(data, crc)
+            f.write(data)
+    elif method == _DEFLATED:
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        while not decompressor.eof:
+            data = stream.read(_BUFFER_SIZE)
+            if not data:
+                raise ValueError("The zip file is truncated.")
+            data = decompressor.decompress(data)
+            crc = zlib.crc32(data, crc)
+            f.write(data)
+        stream.unread(decompressor.unused_data)
+    else:
+        raise ValueError(f"Compression method {method} is not supported.")
+    return crc
+
+
+class _Discard:
+    """File that discards everything written."""
+
+    def __enter__(self):
+        """Open the file.
+
+        Returns:
+            _Discard: the file.
+        """
+        return self
+
+    def __exit__(self, *args):
+        """Close the file.
+
+        Args:
+            *args: exception, if any.
+        """
+
+    def write(self, data):
+        """Discard bytes.
+
+        Args:
+            data (bytes): the bytes.
+        """
+
+
+def _download_ranges(url, path, jobs, progress=None):
+    """Download ranges of a file in parallel, resuming a former run.
+
+    Args:
+        url (str): to be downloaded.
+        path (Path): where the file is written.
+        jobs (int): number of ranges downloaded in parallel.
+        progress (Callable[[int, int], None]): called with the number of
+            bytes downloaded so far, and the size of the file.
+
+    Raises:
+        ValueError: when the server does not support ranges.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    import requests
+
+    response = requests.head(url, allow_redirects=True, timeout=_TIMEOUT)
+    response.raise_for_status()
+    size = int(response.headers.get("content-length", 0))
+    if not size or response.headers.get("accept-ranges") != "bytes":
+        raise ValueError(f'"{url}" can not be downloaded in ranges.')
+
+    state_path = path.with_name(path.name + ".json")
+    state = {"url": url, "size": size, "done": []}
+    if state_path.is_file() and path.is_file():
+        with open(state_path) as f:
+            former = json.load(f)
+        if former["url"] == url and former["size"] == size:
+            state = former
+    if not state["done"]:
+        with open(path, "wb") as f:
+            f.truncate(size)
+
+    ranges = range(0, size, _RANGE_SIZE)
+    done = set(state["done"])
+    lock = threading.Lock()
+    downloaded = [sum(min(_RANGE_SIZE, size - s) for s in done)]
+
+    def _fetch(start):
+        """Download a range and record it as done.
+
+        Args:
+            start (int): first byte of the range.
+
+        Raises:
+            requests.RequestException: when the server fails too many
+                times.
+            ValueError: when the server returns a wrong range.
+        """
+        stop = min(start + _RANGE_SIZE, size)
+        for attempt in range(_RETRIES):
+            try:
+                r = requests.get(
+                    url,
+                    headers={"Range": f"bytes={start}-{stop - 1}"},
+                    timeout=_TIMEOUT,
+                )
+                r.raise_for_status()
+                break
+            except requests.RequestException:
+                if attempt == _RETRIES - 1:
+                    raise
+        if r.status_code != 206 or len(r.content) != stop - start:
+            raise ValueError(f'"{url}" returns a wrong range.')
+
+        with open(path, "r+b") as f:
+            f.seek(start)
+            f.write(r.content)
+
+        with lock:
+            state["done"].append(start)
+            tmp = state_path.with_name(state_path.name + ".tmp")
+            with open(tmp, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp, state_path)
+            downloaded[0] += stop - start
+            if progress is not None:
+                progress(downloaded[0], size)
+
+    if progress is not None:
+        progress(downloaded[0], size)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        list(executor.map(_fetch, [s for s in ranges if s not in done]))
+    state_path.unlink()
+
+
+def _extract_member(archive, path):
+    """Extract the database from a zip file, verified by its CRC-32.
+
+    Args:
+        archive (Path): to the zip file.
+        path (Path): to the database to be written.
+
+    Raises:
+        ValueError: when the database is not found.
+    """
+    import zipfile
+
+    with zipfile.ZipFile(archive) as zf:
+        for info in zf.infolist():
+            if info.filename.rsplit("/", 1)[-1] == _MEMBER:
+                with zf.open(info) as src, open(path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, _BUFFER_SIZE)
+                return
+    raise ValueError(f'"{_MEMBER}" is not found in the zip file.')
+
+
+def _hash_file(path):
+    """Return SHA-256 of a file.
+
+    Args:
+        path (Path): to the file.
+
+    Returns:
+        str: SHA-256 in hex.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(_BUFFER_SIZE), b""):
+            sha256.update(data)
+    return sha256.hexdigest()
@@ -1,4 +1,8 @@
 """Database Connector."""
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from functools import lru_cache
 from os import getenv
 from pathlib import Path
 from sqlite3 import connect
@@ -6,15 +10,35 @@ from sqlite3 import Error
 from typing import Optional
 from typing import Union
 
-from loguru import logger
-
-from cmdict.history import record
+from cmdict.cache import LRUCache
+from cmdict.cache import MISSING
+from cmdict.cache import PersistentCache
+from cmdict.completion import complete
+from cmdict.fuzzy import build_trigram_index
+from cmdict.fuzzy import suggest
+from cmdict.history import get_store
+from cmdict.index_db import IndexDB
+from cmdict.lemma import build_lemma_index
+from cmdict.prepare import has_index
+from cmdict.reverse import build_reverse_batch
+from cmdict.reverse import reverse
+from cmdict.utils import fingerprint
+from cmdict.utils import log_exception
 
 _HISTORY = True if getenv("CMDICT_HISTORY", None) is None else False
 """Whether to record queried words in a YAML file.
 
 `True` if no env var is called `CMDICT_HISTORY`.
 """
+_CACHE = False if getenv("CMDICT_CACHE", None) is None else True
+"""Whether to keep query results in a persistent cache file.
+
+`True` if there is an env var called `CMDICT_CACHE`.
+"""
+_CACHE_SIZE = 100000
+"""Maximum number of query results in the persistent cache file."""
+_CACHE_VERSION = 2
+"""Version of cached values, bumped when their format changes."""
 _PATH = Path(__file__).parent / "data" / "stardict.db"
 _KEY_NAMES = (
     "id",
@@ -31,6 +55,78 @@ _KEY_NAMES = (
     "frq",
     "exchange",
 )
+_COLUMNS = {"trans": "translation"}
+"""Columns of the database, whose names differ from their fields."""
+_PRAGMAS = (
+    "pragma query_only = 1",
+    "pragma mmap_size = 268435456",
+    "pragma cache_size = -65536",
+)
+"""Pragmas tuned for reading, with 256 MiB memory map and 64 MiB cache."""
+_POOL_SIZE = 8
+"""Maximum number of connections opened to the database at a time."""
+_CHUNK_SIZE = 500
+"""Maximum number of words bound in one ``IN (...)`` statement.
+
+It is kept below 999, the default variable limit of older SQLite.
+"""
+
+
+class Entry(Mapping):
+    """Query result of the fields fetched from the database.
+
+    Values are kept in the row returned by SQLite, and positions of the
+    fields are shared by all results of the same query, so that no dict
+    is built for each result.
+
+    """
+
+    __slots__ = ("_positions", "_values")
+
+    def __init__(self, positions, values):
+        """Initialize the query result.
+
+        Args:
+            positions (dict): position of each field in the row.
+            values (tuple): the row.
+        """
+        self._positions = positions
+        self._values = values
+
+    def __getitem__(self, key):
+        """Return the value of a field.
+
+        Args:
+            key (str): name of the field.
+
+        Returns:
+            object: the value.
+        """
+        return self._values[self._positions[key]]
+
+    def __iter__(self):
+        """Iterate names of fields.
+
+        Returns:
+            Iterator[str]: names of fields.
+        """
+        return iter(self._positions)
+
+    def __len__(self):
+        """Return the number of fields.
+
+        Returns:
+            int: the number of fields.
+        """
+        return len(self._positions)
+
+    def __repr__(self):
+        """Represent the query result like a dict.
+
+        Returns:
+            str: representation of the query result.
+        """
+        return repr(dict(self))
 
 
 class ECDICTConnector:
@@ -38,49 +134,185 @@ class ECDICTConnector:
 
     Database from `https://github.com/skywind3000/ECDICT`.
 
+    The database is opened read-only. Connections are kept in a pool of
+    at most ``_POOL_SIZE``, and each query borrows one for its duration,
+    so the connector can be shared by any number of threads with a
+    bounded number of warm connections.
+
     """
 
-    def __init__(self, path: Optional[Union[str, Path]] = _PATH):
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = _PATH,
+        cache_size: int = 0,
+        persistent_cache: Optional[bool] = None,
+    ):
         """Initialize database Connector.
 
         Args:
             path: Path to the database file. Defaults to be ``stardict``.
+            cache_size: Maximum number of query results kept in a LRU
+                cache, including words not found. Defaults to be 0,
+                which disables the cache.
+            persistent_cache: Whether to keep query results in a cache
+                file next to the database, which is shared by processes
+                and dropped when the database changes. Defaults to be
+                None, which follows the env var ``CMDICT_CACHE``.
 
         Raises:
             ValueError: When the database file is missing or invalid.
         """
         _path = Path(path) if isinstance(path, str) else path
+        self._cache = LRUCache(cache_size) if cache_size > 0 else None
+        self._persistent_cache = None
 
         if _path.is_file() and (_path.suffix == ".db"):
-            self._conn = ECDICTConnector._init_conn(path)
+            self._path = _path
+            self._idle = []
+            self._opened = 0
+            self._pool_cond = threading.Condition()
+            self._sw_indexed = False
+            self._index = None
+            # fail early if the database can not be opened
+            try:
+                with self._connection() as conn:
+                    conn.execute("select count(*) from sqlite_master")
+            except Error as exc:
+                raise ValueError(
+                    f'Database file at "{_path}" is invalid.'
+                ) from exc
+            if _CACHE if persistent_cache is None else persistent_cache:
+                self._persistent_cache = PersistentCache(
+                    _path.with_name(f".{_path.stem}.cache.db"),
+                    f"{fingerprint(_path)}:{_CACHE_VERSION}",
+                    _CACHE_SIZE,
+                )
         else:
             raise ValueError(
                 f'Database file at "{_path}" is missing or invalid.'
             )
 
+    @contextmanager
+    def _connection(self):
+        """Borrow a connection from the pool for a query.
+
+        An idle connection is reused if there is one, or a new one is
+        opened if there are less than ``_POOL_SIZE``. Otherwise, it
+        waits for a connection to be returned.
+
+        Yields:
+            sqlite3.Connection: Connection object to the database.
+
+        Raises:
+            Error: when a new connection can not be opened.
+        """
+        with self._pool_cond:
+            while not self._idle and self._opened >= _POOL_SIZE:
+                self._pool_cond.wait()
+            conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                self._opened += 1
+
+        if conn is None:
+            try:
+                conn = ECDICTConnector._init_conn(self._path)
+            except Error:
+                with self._pool_cond:
+                    self._opened -= 1
+                    self._pool_cond.notify()
+                raise
+
+        try:
+            yield conn
+        finally:
+            with self._pool_cond:
+                self._idle.append(conn)
+                self._pool_cond.notify()
+
     @staticmethod
     def _init_conn(path):
-        """Initialize database connection.
+        """Initialize read-only database connection.
 
         Args:
-            path (str): Path to the database file..
+            path (str): Path to the database file.
 
         Returns:
             sqlite3.Connection: Connection object to the database.
+
+        Raises:
+            Error: when the connection can not be configured.
         """
+        # connections are borrowed by any thread, one at a time
+        conn = connect(
+            Path(path).resolve().as_uri() + "?mode=ro",
+            uri=True,
+            check_same_thread=False,
+        )
         try:
-            return connect(path)
+            for pragma in _PRAGMAS:
+                conn.execute(pragma)
         except Error:
-            logger.exception("SQLite DB connection failed.")
+            conn.close()
+            raise
+        return conn
+
+    @property
+    def index(self):
+        """File of indexes derived from the database, opened on demand.
+
+        Returns:
+            IndexDB: the index file.
+        """
+        with self._pool_cond:
+            if self._index is None:
+                self._index = IndexDB(self._path)
+            return self._index
+
+    def close(self):
+        """Close idle connections and the index file.
+
+        Results and hits buffered by the persistent cache are written
+        to its file as well.
+        """
+        if self._persistent_cache is not None:
+            self._persistent_cache.flush()
+        with self._pool_cond:
+            for conn in self._idle:
+                conn.close()
+            self._opened -= len(self._idle)
+            self._idle = []
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+
+    def cache_info(self, persistent=False):
+        """Return statistics of the LRU cache or the persistent cache.
+
+        Args:
+            persistent (bool): whether to return statistics of the
+                persistent cache.
 
-    def query(self, word):
+        Returns:
+            CacheInfo: hits, misses, evictions, maximum and current size,
+                or None if the cache is disabled.
+        """
+        cache = self._persistent_cache if persistent else self._cache
+        return cache.info() if cache else None
+
+    def query(self, word, normalize=False, fields=None):
         """Query word from the database.
 
         Args:
             word (str): the word to be queried.
+            normalize (bool): whether to fall back to the stripped word,
+                in lowercase without punctuation, if there is no exact
+                match. It raises ValueError if the database lacks the
+                index on stripped words.
+            fields (Iterable[str], None): names of fields to be fetched,
+                where ``word`` is always included, or None for all.
 
         Returns:
-            dict: Query result with format:
+            Entry: Query result, a mapping with format:
                 {
                     id: (int)
                     word: (str)
@@ -96,22 +328,428 @@ class ECDICTConnector:
                     "frq": (int)
                     "exchange": (str)
                 }
+                where only the fetched fields are present, or None if it
+                is not found or the search fails.
         """
+        if _HISTORY:
+            get_store().record(word)
+
+        positions = _projection(fields)
+        key = _cache_key(word, normalize, positions)
+        if self._cache is not None:
+            res = self._cache.get(key)
+            if res is not MISSING:
+                return res
+
+        if self._persistent_cache is not None:
+            res = self._persistent_cache.get_many([key])
+            if key in res:
+                res = _from_cache(positions, res[key])
+                if self._cache is not None:
+                    self._cache.put(key, res)
+                return res
+
         try:
-            query = "select * from stardict where word = ?"
-            cursor = self._conn.cursor()
-            cursor.execute(query, (word,))
+            query = "select {} from stardict where word = ?".format(
+                _columns(positions)
+            )
+            with self._connection() as conn:
+                if normalize:
+                    self._check_sw_index(conn)
+                res = conn.execute(query, (word,)).fetchone()
+                res = Entry(positions, res) if res else None
+                if res is None and normalize:
+                    res = self._query_sw(conn, [word], positions)[word]
+
+            if self._cache is not None:
+                self._cache.put(key, res)
+            if self._persistent_cache is not None:
+                self._persistent_cache.put_many({key: _to_cache(res)})
+            return res
 
-            if _HISTORY:
-                record(word)
+        except Error:
+            log_exception("SQLite DB search failed.")
+            return None
 
-            res = cursor.fetchone()
+    def query_many(self, words, normalize=False, fields=None):
+        """Query several words from the database in batched statements.
 
-            return (
-                dict([(x, y) for x, y in zip(_KEY_NAMES, res)])
-                if res
-                else None
+        Duplicated words are queried only once, and words are resolved
+        in chunks of ``IN (...)`` statements instead of one statement
+        per word. Words in the LRU cache or the persistent cache are not
+        queried again. Only columns of the requested fields are read.
+
+        Args:
+            words (Iterable[str]): the words to be queried.
+            normalize (bool): whether to fall back to stripped words, in
+                lowercase without punctuation, for words without an
+                exact match. It raises ValueError if the database lacks
+                the index on stripped words.
+            fields (Iterable[str], None): names of fields to be fetched,
+                where ``word`` is always included, or None for all.
+
+        Returns:
+            dict: mapping from each distinct word, in the order of first
+                appearance, to its query result in the same format as
+                ``query``, or None if it is not found or the search
+                fails.
+        """
+        words = list(dict.fromkeys(words))
+        res = dict.fromkeys(words)
+
+        if _HISTORY:
+            get_store().record_many(words)
+
+        positions = _projection(fields)
+        keys = {w: _cache_key(w, normalize, positions) for w in words}
+        missing = words
+        if self._cache is not None:
+            missing = []
+            for word in words:
+                res[word] = self._cache.get(keys[word])
+                if res[word] is MISSING:
+                    missing.append(word)
+
+        if self._persistent_cache is not None and missing:
+            cached = self._persistent_cache.get_many(
+                [keys[w] for w in missing]
             )
+            found = [w for w in missing if keys[w] in cached]
+            for word in found:
+                res[word] = _from_cache(positions, cached[keys[word]])
+                if self._cache is not None:
+                    self._cache.put(keys[word], res[word])
+            missing = [w for w in missing if keys[w] not in cached]
+
+        try:
+            with self._connection() as conn:
+                if normalize:
+                    self._check_sw_index(conn)
+                self._query_words(conn, missing, positions, res)
+                if normalize:
+                    res.update(
+                        self._query_sw(
+                            conn,
+                            [w for w in missing if res[w] is None],
+                            positions,
+                        )
+                    )
+
+            if self._cache is not None:
+                for word in missing:
+                    self._cache.put(keys[word], res[word])
+            if self._persistent_cache is not None:
+                self._persistent_cache.put_many(
+                    {keys[w]: _to_cache(res[w]) for w in missing}
+                )
+            return res
+
+        except Error:
+            log_exception("SQLite DB search failed.")
+            return {w: None if v is MISSING else v for w, v in res.items()}
 
+    def lemmatize(self, words):
+        """Resolve inflected forms to their headwords in batches.
+
+        The index of inflected forms is built from ``exchange`` when it
+        is first needed, see ``build_lemma_index``.
+
+        Args:
+            words (Iterable[str]): the words, such as "produced".
+
+        Returns:
+            dict: mapping from each distinct word, in the order of first
+                appearance, to its headword such as "produce", or the
+                word itself if it is not an inflected form or the index
+                fails.
+        """
+        words = list(dict.fromkeys(words))
+
+        found = {}
+        try:
+            self.index.ensure("lemmas", build_lemma_index)
+            for start in range(0, len(words), _CHUNK_SIZE):
+                stop = start + _CHUNK_SIZE
+                chunk = words[start:stop]
+                query = "select form, lemma from lemmas where form in ({})"
+                rows = self.index.execute(
+                    query.format(", ".join("?" * len(chunk))), chunk
+                )
+                found.update((form.lower(), lemma) for form, lemma in rows)
         except Error:
-            logger.exception("SQLite DB search failed.")
+            log_exception("SQLite lemma index failed.")
+        return {w: found.get(w.lower(), w) for w in words}
+
+    def complete(self, prefix, limit=10):
+        """Complete a prefix into headwords, ranked by frequency.
+
+        The table of ranked headwords is built by ``prepare``, see
+        ``build_ranked_index``. Without it, headwords are completed in
+        alphabetical order, instead of building it in the meantime.
+
+        Args:
+            prefix (str): the prefix, such as "pro".
+            limit (int): maximum number of headwords.
+
+        Returns:
+            list[str]: headwords starting with the prefix, or None if
+                the index fails.
+        """
+        try:
+            return complete(
+                self.index, prefix, limit, self.index.built("ranked")
+            )
+        except Error:
+            log_exception("SQLite completion index failed.")
+
+    def reverse(self, phrase, limit=10, progress=None):
+        """Search headwords by their translations or definitions.
+
+        The full text index is built in batches when it is first needed,
+        see ``build_reverse_batch``, and an interrupted build resumes.
+
+        Args:
+            phrase (str): a Chinese or English phrase, such as "苹果".
+            limit (int): maximum number of headwords.
+            progress (Callable[[int], None]): called with the number of
+                headwords indexed in each batch, while building.
+
+        Returns:
+            list[str]: headwords ranked by relevance, then frequency, or
+                None if the index fails.
+        """
+        try:
+            self.index.ensure_batched("reverse", build_reverse_batch, progress)
+            return reverse(self.index, phrase, limit)
+        except Error:
+            log_exception("SQLite reverse index failed.")
+
+    def suggest(self, word, max_distance=2, limit=5):
+        """Suggest headwords within an edit distance of a word.
+
+        The index of trigrams is built from ``word`` when it is first
+        needed, see ``build_trigram_index``.
+
+        Args:
+            word (str): the word, which may be misspelled.
+            max_distance (int): maximum edit distance of suggestions.
+            limit (int): maximum number of suggestions.
+
+        Returns:
+            list[str]: headwords ranked by edit distance, then frequency,
+                or None if the index fails.
+        """
+        try:
+            self.index.ensure("trigrams_by_length", build_trigram_index)
+            return suggest(self.index, word, max_distance, limit)
+        except Error:
+            log_exception("SQLite trigram index failed.")
+
+    @staticmethod
+    def _query_words(conn, words, positions, res):
+        """Query words in batched statements.
+
+        Args:
+            conn (sqlite3.Connection): borrowed connection.
+            words (list[str]): the words to be queried.
+            positions (dict): projection of fields, see ``_projection``.
+            res (dict): where the query result of each word is set, or
+                None if it is not found.
+        """
+        word_pos = positions["word"]
+        for start in range(0, len(words), _CHUNK_SIZE):
+            stop = start + _CHUNK_SIZE
+            chunk = words[start:stop]
+            query = "select {} from stardict where word in ({})".format(
+                _columns(positions), ", ".join("?" * len(chunk))
+            )
+
+            # ``word`` is case insensitive in the database, so rows are
+            # matched back to the queried words in lowercase.
+            found = {
+                row[word_pos].lower(): Entry(positions, row)
+                for row in conn.execute(query, chunk)
+            }
+            for word in chunk:
+                res[word] = found.get(word.lower())
+
+    def _query_sw(self, conn, words, positions):
+        """Query words by their stripped words in batched statements.
+
+        When several entries share a stripped word, the most frequent
+        one is preferred.
+
+        Args:
+            conn (sqlite3.Connection): borrowed connection.
+            words (list[str]): the words to be queried.
+            positions (dict): projection of fields, see ``_projection``.
+
+        Returns:
+            dict: mapping from each word to its query result, or None
+                if it is not found.
+        """
+        sws = {w: strip_word(w) for w in words}
+        distinct = list(dict.fromkeys(sw for sw in sws.values() if sw))
+        found = {}
+        cursor = conn.cursor()
+        for start in range(0, len(distinct), _CHUNK_SIZE):
+            stop = start + _CHUNK_SIZE
+            chunk = distinct[start:stop]
+            query = (
+                "select sw, frq, bnc, id, {} from stardict where sw in ({})"
+            ).format(_columns(positions), ", ".join("?" * len(chunk)))
+            cursor.execute(query, chunk)
+
+            # columns for ranking come first, before the projection
+            for row in cursor.fetchall():
+                sw, rank = row[0].lower(), _rank(*row[1:4])
+                if sw not in found or rank < found[sw][0]:
+                    found[sw] = (rank, row[4:])
+        return {
+            w: Entry(positions, found[sw][1]) if sw in found else None
+            for w, sw in sws.items()
+        }
+
+    def _check_sw_index(self, conn):
+        """Check the database has the index on stripped words.
+
+        The database is never modified here, the index is created by
+        ``cmdict prepare``.
+
+        Args:
+            conn (sqlite3.Connection): borrowed connection.
+
+        Raises:
+            ValueError: when the index is missing.
+        """
+        if not self._sw_indexed:
+            if not has_index(conn, "sw"):
+                raise ValueError(
+                    "Normalized lookup needs the index on stripped words, "
+                    "please prepare the database: `cmdict prepare`."
+                )
+            self._sw_indexed = True
+
+
+def strip_word(word):
+    """Strip a word like the ``sw`` column of ECDICT.
+
+    Args:
+        word (str): the word.
+
+    Returns:
+        str: the word in lowercase, without characters other than
+            letters and digits.
+    """
+    return "".join(c for c in word if c.isalnum()).lower()
+
+
+def _projection(fields=None):
+    """Return positions of fields fetched by a query.
+
+    Args:
+        fields (Iterable[str], None): names of fields, or None for all.
+
+    Returns:
+        dict: position of each field in a row, in the order of columns,
+            where ``word`` is always included. It is shared by results
+            of the same projection.
+
+    Raises:
+        ValueError: when a field is unknown.
+    """
+    if fields is None:
+        return _positions(None)
+
+    fields = frozenset(fields)
+    unknown = fields.difference(_KEY_NAMES)
+    if unknown:
+        raise ValueError(f"Fields {sorted(unknown)} are unknown.")
+    return _positions(fields)
+
+
+@lru_cache(maxsize=None)
+def _positions(fields):
+    """Return positions of fields, cached for each set of fields.
+
+    Args:
+        fields (frozenset[str], None): names of fields, or None for all.
+
+    Returns:
+        dict: position of each field in a row.
+    """
+    if fields is None:
+        keys = _KEY_NAMES
+    else:
+        keys = [k for k in _KEY_NAMES if k == "word" or k in fields]
+    return {k: i for i, k in enumerate(keys)}
+
+
+def _columns(positions):
+    """Return columns of the database selected for a projection.
+
+    Args:
+        positions (dict): projection of fields, see ``_projection``.
+
+    Returns:
+        str: names of columns separated by commas.
+    """
+    return ", ".join(_COLUMNS.get(k, k) for k in positions)
+
+
+def _cache_key(word, normalize, positions):
+    """Return the key of a word in caches.
+
+    Args:
+        word (str): the word.
+        normalize (bool): whether the word is queried with fallback to
+            its stripped word.
+        positions (dict): projection of fields, see ``_projection``.
+
+    Returns:
+        str: the key, which is prefixed by a null character for
+            normalized queries, and by names of fields followed by a
+            null character for queries of some fields.
+    """
+    if len(positions) < len(_KEY_NAMES):
+        word = ",".join(positions) + "\0" + word
+    return "\0" + word if normalize else word
+
+
+def _to_cache(res):
+    """Convert a query result to be kept in the persistent cache.
+
+    Args:
+        res (Entry, None): the query result.
+
+    Returns:
+        list: values of fields, or None if the word is not found.
+    """
+    return None if res is None else list(res.values())
+
+
+def _from_cache(positions, value):
+    """Convert a value in the persistent cache back to a query result.
+
+    Args:
+        positions (dict): projection of fields, see ``_projection``.
+        value (list, None): values of fields.
+
+    Returns:
+        Entry: the query result, or None if the word is not found.
+    """
+    return None if value is None else Entry(positions, tuple(value))
+
+
+def _rank(frq, bnc, id_):
+    """Return the key to prefer frequent entries.
+
+    Args:
+        frq (int, None): frequency rank.
+        bnc (int, None): BNC rank.
+        id_ (int): id of the entry.
+
+    Returns:
+        tuple: sort key, where entries without a rank are placed last.
+    """
+    return (not frq, frq or 0, not bnc, bnc or 0, id_)
@@ -0,0 +1,245 @@
+"""Typo tolerant suggestions, backed by an index of trigrams.
+
+Each headword is padded like ``^^word$`` and split into trigrams. The
+index keeps, for each trigram and length of headwords, how many
+headwords contain it and their ids, so only headwords within ``k`` of
+the length of a word are read. One edit changes at most 3 trigrams, so
+a headword within edit distance ``k`` of a word shares at least
+``t - 3k`` of any ``t`` distinct trigrams of the word. Only ids in the
+postings of the rarest trigrams are counted, and candidates sharing
+enough trigrams are verified by their Levenshtein distance.
+
+The bound is useless for words of at most ``3k`` characters, which
+share no trigram with some close headwords. Instead, all strings within
+edit distance ``k`` of such a word are looked up as headwords.
+"""
+import string
+from array import array
+from collections import Counter
+
+_MAX_DF = 20000
+"""Postings longer than this are skipped, if enough trigrams are left."""
+_CHUNK_SIZE = 500
+"""Maximum number of values bound in one ``IN (...)`` statement."""
+_MAX_EDITS = 2
+"""Maximum edit distance of strings looked up for short words."""
+_ALPHABET = string.ascii_lowercase + " -'"
+"""Characters inserted or substituted in strings looked up."""
+
+
+def build_trigram_index(conn):
+    """Build a table of trigrams of headwords, by their length.
+
+    Args:
+        conn (sqlite3.Connection): to the index file, where the database
+            is attached as ``src``.
+    """
+    postings = {}
+    rows = conn.execute("select id, word from src.stardict order by id")
+    for id_, word in rows:
+        n = len(word.lower())
+        for gram in set(_grams(word)):
+            ids = postings.get((gram, n))
+            if ids is None:
+                ids = postings[gram, n] = array("I")
+            ids.append(id_)
+
+    # trigrams of earlier versions are not bucketed by length
+    conn.execute("drop table if exists trigrams")
+    conn.execute(
+        "create table trigrams (gram text not null, len integer not null, "
+        "df integer not null, ids blob not null, primary key (gram, len)) "
+        "without rowid"
+    )
+    conn.executemany(
+        "insert into trigrams values (?, ?, ?, ?)",
+        ((g, n, len(ids), ids.tobytes()) for (g, n), ids in postings.items()),
+    )
+
+
+def suggest(index, word, max_distance=2, limit=5):
+    """Suggest headwords close to a word.
+
+    Args:
+        index (IndexDB): index file with the table of trigrams.
+        word (str): the word, which is case insensitive.
+        max_distance (int): maximum edit distance of suggestions.
+        limit (int): maximum number of suggestions.
+
+    Returns:
+        list[str]: headwords ranked by edit distance, then frequency.
+            For short words, headwords with characters beyond
+            ``_ALPHABET`` and the word are missed. Beyond ``_MAX_EDITS``,
+            headwords sharing no trigram with short words are missed.
+    """
+    word = word.lower()
+    grams = list(set(_grams(word)))
+    if len(grams) <= 3 * max_distance + 1 and max_distance <= _MAX_EDITS:
+        rows = _lookup(
+            index,
+            "select word, frq, bnc from src.stardict where word in ({})",
+            list(_edits(word, max_distance)),
+        )
+    else:
+        rows = _lookup(
+            index,
+            "select word, frq, bnc from src.stardict where id in ({})",
+            _candidates(index, word, grams, max_distance),
+        )
+
+    found = []
+    for w, frq, bnc in rows:
+        distance = levenshtein(word, w.lower(), max_distance)
+        if distance <= max_distance:
+            found.append((distance, not frq, frq or 0, not bnc, bnc or 0, w))
+
+    found.sort()
+    return [item[-1] for item in found[:limit]]
+
+
+def _candidates(index, word, grams, max_distance):
+    """Return ids of headwords sharing enough trigrams with a word.
+
+    Only postings of headwords within ``max_distance`` of the length of
+    the word are read.
+
+    Args:
+        index (IndexDB): index file with the table of trigrams.
+        word (str): the word in lowercase.
+        grams (list[str]): distinct trigrams of the word.
+        max_distance (int): maximum edit distance of suggestions.
+
+    Returns:
+        list[int]: ids of the candidates.
+    """
+    lengths = [len(word) - max_distance, len(word) + max_distance]
+    dfs = dict(
+        _lookup(
+            index,
+            "select gram, sum(df) from trigrams "
+            "where len between ? and ? and gram in ({}) group by gram",
+            grams,
+            lengths,
+        )
+    )
+
+    # grams missing in the index have no postings, but still count
+    # towards ``t`` for the pigeonhole principle
+    dfs = sorted((dfs.get(g, 0), g) for g in grams)
+    t = len(dfs)
+    while t > 3 * max_distance + 1 and dfs[t - 1][0] > _MAX_DF:
+        t -= 1
+    required = max(1, t - 3 * max_distance)
+    selected = [g for df, g in dfs[:t] if df]
+
+    counts = Counter()
+    for (ids,) in _lookup(
+        index,
+        "select ids from trigrams where len between ? and ? and gram in ({})",
+        selected,
+        lengths,
+    ):
+        posting = array("I")
+        posting.frombytes(ids)
+        counts.update(posting)
+    return [id_ for id_, n in counts.items() if n >= required]
+
+
+def _lookup(index, query, values, parameters=()):
+    """Execute a query with values bound in chunks of ``IN (...)``.
+
+    Args:
+        index (IndexDB): index file.
+        query (str): the query, with ``{}`` in place of the values.
+        values (list): values bound in ``IN (...)``.
+        parameters (Sequence): parameters bound before the values.
+
+    Returns:
+        list[tuple]: the rows of all chunks.
+    """
+    rows = []
+    for start in range(0, len(values), _CHUNK_SIZE):
+        stop = start + _CHUNK_SIZE
+        chunk = values[start:stop]
+        rows.extend(
+            index.execute(
+                query.format(", ".join("?" * len(chunk))),
+                [*parameters, *chunk],
+            )
+        )
+    return rows
+
+
+def _edits(word, max_distance):
+    """Return strings within an edit distance of a word.
+
+    Args:
+        word (str): the word.
+        max_distance (int): maximum edit distance.
+
+    Returns:
+        set[str]: the strings, including the word.
+    """
+    alphabet = set(_ALPHABET + word)
+    found = level = {word}
+    for _ in range(max_distance):
+        edits = set()
+        for w in level:
+            for i in range(len(w) + 1):
+                head, tail = w[:i], w[i:]
+                edits.update(head + c + tail for c in alphabet)
+                if tail:
+                    edits.add(head + tail[1:])
+                    edits.update(head + c + tail[1:] for c in alphabet)
+        level = edits - found
+        found = found | level
+    return found
+
+
+def levenshtein(a, b, max_distance=None):
+    """Return the edit distance between two strings.
+
+    Args:
+        a (str): a string.
+        b (str): another string.
+        max_distance (int, None): stop early once the distance is known
+            to exceed it.
+
+    Returns:
+        int: the edit distance, or ``max_distance + 1`` if it exceeds
+            ``max_distance``.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    bound = len(a) if max_distance is None else max_distance
+    if len(a) - len(b) > bound:
+        return bound + 1
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ca != cb),
+                )
+            )
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+    return min(previous[-1], bound + 1)
+
+
+def _grams(word):
+    """Split a word into padded trigrams.
+
+    Args:
+        word (str): the word.
+
+    Returns:
+        list[str]: trigrams of the word in lowercase.
+    """
+    padded = "^^" + word.lower() + "$"
+    return ["".join(g) for g in zip(padded, padded[1:], padded[2:])]
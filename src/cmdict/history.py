@@ -1,14 +1,186 @@
 """Function to record and read user history."""
+import atexit
 import os
 import pathlib
+import threading
+from typing import Dict
+from typing import Iterable
+from typing import List
 from typing import Optional
 
-import yaml
-from loguru import logger
+from cmdict.utils import log_exception
 
 _PATH = os.path.join(
     str(pathlib.Path(__file__).parent), "data", ".history.yaml"
 )
+_BUFFER_SIZE = 256
+"""Number of buffered words that triggers a flush to the yaml file."""
+
+
+class HistoryStore:
+    """Append-only history of queried words in a yaml file.
+
+    The yaml file is parsed at most once, when the first word is
+    recorded. Afterwards, duplicates are detected with an in-memory set,
+    and new words are buffered and appended to the file in batches, so
+    the file stays a plain yaml list of words. It is safe to record
+    words from several threads.
+
+    """
+
+    def __init__(
+        self, path: Optional[str] = _PATH, buffer_size: int = _BUFFER_SIZE
+    ):
+        """Initialize the history store.
+
+        Args:
+            path: to the yaml file.
+            buffer_size: number of buffered words that triggers a flush.
+
+        Raises:
+            ValueError: when the path is not to a yaml file.
+        """
+        if not path.endswith(".yaml"):
+            raise ValueError(f'"{path}" is not a yaml file.')
+
+        self._path = path
+        self._buffer_size = buffer_size
+        self._words: Optional[List[str]] = None
+        self._seen = set()
+        self._pending: List[str] = []
+        self._rewrite = False
+        self._stat = None
+        self._lock = threading.RLock()
+
+    def __contains__(self, word):
+        """Return if the word has been recorded.
+
+        Args:
+            word (str): the word.
+
+        Returns:
+            bool: if the word has been recorded.
+        """
+        with self._lock:
+            self._sync()
+            return word in self._seen
+
+    def words(self):
+        """Return all recorded words, including buffered ones.
+
+        Returns:
+            list[str]: recorded words in the order of first record.
+        """
+        with self._lock:
+            self._sync()
+            return list(self._words)
+
+    def record(self, word: str):
+        """Record a word, if it has not been recorded before.
+
+        Args:
+            word: to be recorded.
+        """
+        self.record_many((word,))
+
+    def record_many(self, words: Iterable[str]):
+        """Record several words, skipping those recorded before.
+
+        Args:
+            words: to be recorded.
+        """
+        with self._lock:
+            self._sync()
+            for word in words:
+                if word not in self._seen:
+                    self._seen.add(word)
+                    self._words.append(word)
+                    self._pending.append(word)
+
+            if len(self._pending) >= self._buffer_size:
+                self.flush()
+
+    def flush(self):
+        """Append all buffered words to the yaml file."""
+        with self._lock:
+            if not self._pending:
+                return
+
+            import yaml
+
+            if self._rewrite:
+                with open(self._path, "w") as f:
+                    yaml.safe_dump(self._words, f)
+                self._rewrite = False
+            else:
+                with open(self._path, "a") as f:
+                    yaml.safe_dump(self._pending, f)
+
+            self._pending = []
+            self._stat = self._file_stat()
+
+    def _sync(self):
+        """Load recorded words, if the yaml file was changed by others."""
+        if self._words is not None and self._stat == self._file_stat():
+            return
+
+        import yaml
+
+        history = None
+        if pathlib.Path(self._path).is_file():
+            with open(self._path, "r") as f:
+                try:
+                    history = yaml.safe_load(f)
+                except yaml.YAMLError as exc:
+                    log_exception(exc)
+
+        # An empty or broken file is replaced by recorded words.
+        self._rewrite = history is None
+        self._words = list(history or ())
+        self._seen = set(self._words)
+        self._pending = [w for w in self._pending if w not in self._seen]
+        self._words.extend(self._pending)
+        self._seen.update(self._pending)
+        self._stat = self._file_stat()
+
+    def _file_stat(self):
+        """Return the size and modification time of the yaml file.
+
+        Returns:
+            tuple: size and modification time, or None if there is no
+                such file.
+        """
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+
+_STORES: Dict[str, HistoryStore] = {}
+
+
+def get_store(path: Optional[str] = _PATH):
+    """Get the shared history store of a yaml file.
+
+    Buffered words of shared stores are flushed when Python exits.
+
+    Args:
+        path: to the yaml file.
+
+    Returns:
+        HistoryStore: the shared history store.
+    """
+    if path not in _STORES:
+        _STORES[path] = HistoryStore(path)
+    return _STORES[path]
+
+
+@atexit.register
+def flush_all():
+    """Flush buffered words of all shared history stores."""
+    for store in _STORES.values():
+        store.flush()
 
 
 def record(word: str, path: Optional[str] = _PATH):
@@ -29,20 +201,6 @@ def record(word: str, path: Optional[str] = _PATH):
     if not path.endswith(".yaml"):
         raise ValueError(f'"{path}" is not a yaml file.')
 
-    if not pathlib.Path(path).is_file():
-        with open(path, "w") as f:
-            yaml.safe_dump([word], f)
-    else:
-        history: list[str] = None
-        with open(path, "r") as f:
-            try:
-                history = yaml.safe_load(f)
-            except yaml.YAMLError as exc:
-                logger.exception(exc)
-
-        if history is None:
-            with open(path, "w") as f:
-                yaml.safe_dump([word], f)
-        elif word not in history:
-            with open(path, "a") as f:
-                yaml.safe_dump([word], f)
+    store = get_store(path)
+    store.record(word)
+    store.flush()
@@ -0,0 +1,193 @@
+"""File of indexes derived from the database.
+
+Indexes are built once, when they are first needed, into a SQLite file
+next to the database, which is never modified. The file belongs to one
+version of the database, identified by its fingerprint, and it is
+rebuilt after the database changes. A new file is created beside it and
+replaces it at once, so other processes never see it missing or empty.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+from cmdict.utils import fingerprint
+
+_VERSION = 2
+"""Version of built indexes, bumped when how they are built changes."""
+
+
+class IndexDB:
+    """Derived indexes of a database, built on demand.
+
+    The database is attached as ``src`` to the connection, so indexes
+    can be built and joined with ``src.stardict`` in SQL. It is safe to
+    use the file from several threads.
+
+    """
+
+    def __init__(self, db_path):
+        """Open the index file of a database, creating it if necessary.
+
+        Args:
+            db_path (str, Path): to the database file.
+        """
+        db_path = Path(db_path)
+        self.path = db_path.with_name(f".{db_path.stem}.index.db")
+        """Path to the index file."""
+
+        self._lock = threading.RLock()
+        self._conn = self._connect(f"{fingerprint(db_path)}:{_VERSION}")
+        self._conn.execute(
+            "attach database ? as src",
+            (db_path.resolve().as_uri() + "?mode=ro",),
+        )
+
+    def _connect(self, source):
+        """Connect to the index file, replacing it if it is stale.
+
+        Args:
+            source (str): fingerprint of the database.
+
+        Returns:
+            sqlite3.Connection: connection to the index file.
+        """
+        if self.path.is_file():
+            conn = sqlite3.connect(
+                str(self.path), uri=True, check_same_thread=False
+            )
+            try:
+                row = conn.execute(
+                    "select value from meta where key = 'fingerprint'"
+                ).fetchone()
+            except sqlite3.DatabaseError:
+                row = None
+            if row is not None and row[0] == source:
+                return conn
+            conn.close()
+
+        self._create(source)
+        return sqlite3.connect(
+            str(self.path), uri=True, check_same_thread=False
+        )
+
+    def _create(self, source):
+        """Create an empty index file, replacing the file if it exists.
+
+        Args:
+            source (str): fingerprint of the database.
+        """
+        fd, tmp = tempfile.mkstemp(
+            suffix=".db", prefix=f"{self.path.stem}.", dir=self.path.parent
+        )
+        os.close(fd)
+        done = False
+        conn = sqlite3.connect(tmp)
+        try:
+            with conn:
+                conn.execute(
+                    "create table meta (key text primary key, value text)"
+                )
+                conn.execute(
+                    "insert into meta values ('fingerprint', ?)", (source,)
+                )
+            conn.close()
+            os.replace(tmp, self.path)
+            done = True
+        finally:
+            conn.close()
+            if not done:
+                Path(tmp).unlink(missing_ok=True)
+
+    def close(self):
+        """Close the index file."""
+        with self._lock:
+            self._conn.close()
+
+    def built(self, name):
+        """Return if an index has been built.
+
+        Args:
+            name (str): name of the index.
+
+        Returns:
+            bool: if the index has been built.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "select 1 from meta where key = ?", (f"built:{name}",)
+            ).fetchone()
+        return row is not None
+
+    def ensure(self, name, build):
+        """Build an index, unless it has been built.
+
+        Args:
+            name (str): name of the index.
+            build (Callable[[sqlite3.Connection], None]): function to
+                build the index with the connection, in a transaction.
+        """
+        with self._lock:
+            if not self.built(name):
+                with self._conn:
+                    build(self._conn)
+                    self._conn.execute(
+                        "insert into meta values (?, '1')", (f"built:{name}",)
+                    )
+
+    def ensure_batched(self, name, build_batch, progress=None):
+        """Build an index in batches, unless it has been built.
+
+        Each batch is committed on its own, and the position after the
+        last committed batch is kept, so an interrupted build resumes
+        from there.
+
+        Args:
+            name (str): name of the index.
+            build_batch (Callable[[sqlite3.Connection, int], tuple]):
+                function to build the batch after a position, returning
+                the next position and the number of rows in the batch,
+                which is 0 when the index is complete.
+            progress (Callable[[int], None]): called with the number of
+                rows of each batch.
+        """
+        key = f"built:{name}"
+        with self._lock:
+            row = self._conn.execute(
+                "select 1 from meta where key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                return
+
+            row = self._conn.execute(
+                "select value from meta where key = ?", (f"position:{name}",)
+            ).fetchone()
+            position = 0 if row is None else int(row[0])
+            while True:
+                with self._conn:
+                    position, n = build_batch(self._conn, position)
+                    self._conn.execute(
+                        "insert or replace into meta values (?, ?)",
+                        (f"position:{name}", str(position)),
+                    )
+                    if not n:
+                        self._conn.execute(
+                            "insert into meta values (?, '1')", (key,)
+                        )
+                        return
+                if progress is not None:
+                    progress(n)
+
+    def execute(self, sql, parameters=()):
+        """Execute a statement and fetch all rows.
+
+        Args:
+            sql (str): the statement.
+            parameters (Sequence): parameters of the statement.
+
+        Returns:
+            list[tuple]: the rows.
+        """
+        with self._lock:
+            return self._conn.execute(sql, parameters).fetchall()
@@ -0,0 +1,76 @@
+"""Index of inflected forms, built from ``exchange`` of ECDICT.
+
+``exchange`` of a headword lists its inflections like
+``p:played/d:played/i:playing/3:plays``, and ``exchange`` of an
+inflected form names its lemma like ``0:combine/1:dp``.
+"""
+_INFLECTIONS = frozenset("pdi3rts")
+"""Types of inflections: past tense, past participle, present
+participle, third person singular, comparative, superlative and plural.
+"""
+_LEMMA = "0"
+"""Type of the lemma of an inflected form."""
+
+
+def build_lemma_index(conn):
+    """Build a table mapping each inflected form to its headword.
+
+    A form is mapped to the lemma named in its own ``exchange`` first,
+    and otherwise to the most frequent headword listing it as an
+    inflection, unless the form is a headword itself, such as "number"
+    listed as the comparative of "numb". Lemmas that are not headwords
+    in the database are ignored.
+
+    Args:
+        conn (sqlite3.Connection): to the index file, where the database
+            is attached as ``src``.
+    """
+    conn.execute(
+        "create temp table candidates "
+        "(form text not null, lemma text not null, priority integer)"
+    )
+    rows = conn.execute(
+        "select word, exchange from src.stardict "
+        "where exchange is not null and exchange != ''"
+    )
+    conn.executemany(
+        "insert into candidates values (?, ?, ?)",
+        (item for row in rows for item in _parse_exchange(*row)),
+    )
+
+    conn.execute(
+        "create table lemmas "
+        "(form text primary key collate nocase, lemma text not null)"
+    )
+    conn.execute(
+        "insert into lemmas select form, lemma from ("
+        "select c.form, s.word as lemma, row_number() over ("
+        "partition by lower(c.form) order by c.priority, "
+        "coalesce(s.frq, 0) = 0, s.frq, coalesce(s.bnc, 0) = 0, s.bnc, s.id"
+        ") as n from candidates as c join src.stardict as s "
+        "on s.word = c.lemma where c.priority = 0 or not exists ("
+        "select 1 from src.stardict as h where h.word = c.form)"
+        ") where n = 1"
+    )
+    conn.execute("drop table candidates")
+
+
+def _parse_exchange(word, exchange):
+    """Parse ``exchange`` of a headword into candidates of the index.
+
+    Args:
+        word (str): the headword.
+        exchange (str): its ``exchange``.
+
+    Yields:
+        tuple: inflected form, its lemma, and priority of the mapping,
+            where a lemma named by the form itself comes first.
+    """
+    for item in exchange.split("/"):
+        k, _, v = item.partition(":")
+        if not v or v.lower() == word.lower():
+            continue
+        if k == _LEMMA:
+            yield word, v, 0
+        elif k in _INFLECTIONS:
+            yield v, word, 1
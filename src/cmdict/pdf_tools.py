@@ -1,17 +1,22 @@
 """Functions to handle highlights in PDF files."""
+import os
+import pathlib
+from collections import defaultdict
+from importlib.util import find_spec
+from math import ceil
+from math import floor
+
 from cmdict.ecdict_connector import ECDICTConnector
-from cmdict.utils import remove_punctuation
+from cmdict.history import flush_all
+from cmdict.tokenizer import remove_punctuation
 
 PDF_FEATURES: bool
 """If the features for PDF are enabled."""
-try:
-    # ``import fitz`` still works, if the directory where it comes from
-    # is empty, so the following command must be used.
-    from fitz import open  # noqa: A004
-except (ImportError, ModuleNotFoundError):
-    PDF_FEATURES = False
-else:
-    PDF_FEATURES = True
+# ``import fitz`` still works, if the directory where it comes from is
+# empty, so the module must be located in a file. ``fitz`` is not
+# imported until a PDF file is opened, which is slow.
+_FITZ_SPEC = find_spec("fitz")
+PDF_FEATURES = _FITZ_SPEC is not None and _FITZ_SPEC.has_location
 
 PREVIEW_COLORS = {
     "yellow": [250, 205, 90],
@@ -23,6 +28,10 @@ PREVIEW_COLORS = {
 """Colors supported by MacOS Preview by default."""
 
 PDF_ANNOT_HIGHLIGHT = 8
+_GRID_CELL_SIZE = 32.0
+"""Side length of grid cells to index word blocks, in PDF points."""
+_TASKS_PER_JOB = 4
+"""Number of page ranges per worker process, to balance the load."""
 
 
 def extract_words(file_path, color):
@@ -38,57 +47,224 @@ def extract_words(file_path, color):
     if color.lower() not in PREVIEW_COLORS:
         return []
 
+    return _extract_page_range(file_path, color)
+
+
+def extract_words_from_paths(paths, color, jobs=1):
+    """Extract highlighted words with specified color in PDF files.
+
+    Pages of all files are split into ranges, which are extracted in a
+    process pool, where each worker opens its own document and flushes
+    the history of words it has queried.
+
+    Args:
+        paths (Iterable[str]): paths to PDF files, or directories
+            containing PDF files.
+        color (str): target color name.
+        jobs (int): number of worker processes. All CPUs are used if it
+            is ``None`` or not positive.
+
+    Returns:
+        set[str]: deduplicated words found in all files.
+    """
+    if color.lower() not in PREVIEW_COLORS:
+        return set()
+
+    jobs = jobs if jobs and jobs > 0 else os.cpu_count()
+    files = list(_iterate_pdf_files(paths))
+
+    res = set()
+    if jobs == 1:
+        for file_path in files:
+            res.update(_extract_page_range(file_path, color))
+        return res
+
+    tasks = []
+    for file_path in files:
+        with _open_document(file_path) as document:
+            page_count = document.page_count
+        step = max(1, ceil(page_count / (jobs * _TASKS_PER_JOB)))
+        for start in range(0, page_count, step):
+            tasks.append((file_path, start, min(start + step, page_count)))
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for words in executor.map(
+            _extract_in_worker,
+            [t[0] for t in tasks],
+            [color] * len(tasks),
+            [t[1] for t in tasks],
+            [t[2] for t in tasks],
+        ):
+            res.update(words)
+
+    return res
+
+
+def _extract_page_range(file_path, color, start=0, stop=None):
+    """Extract highlighted words with specified color in some pages.
+
+    Args:
+        file_path (str): target file path.
+        color (str): target color name.
+        start (int): index of the first page.
+        stop (int, None): index after the last page, or None for the
+            last page of the document.
+
+    Returns:
+        set[str]: found words.
+    """
     res = set()
-    document = open(file_path)
-    for annot in _iterate_filtered_annotations(document, color):
-        # annotation may contain several rectangles in different rows
-        word_list = []
-        rect_counts = len(annot.vertices) // 4
-        for i in range(rect_counts):
-            for word_block in _iterate_all_word_blocks(document):
-                if _check_contain(
-                    (annot.vertices[i * 4] + annot.vertices[i * 4 + 3]),
-                    word_block[:4],
-                ):
-                    word_list.append(word_block[4])
-
-        for word in _fix_hyphen_broken(word_list):
-            res.add(remove_punctuation(word))
+    with _open_document(file_path) as document:
+        for page in document.pages(start, stop):
+            # words are only extracted for pages with target highlights
+            word_grid = None
+            for annot in _iterate_filtered_annotations(page, color):
+                if word_grid is None:
+                    word_grid = _WordGrid(page.get_text("words"))
+
+                # annotation may contain several rectangles in different rows
+                word_list = []
+                rect_counts = len(annot.vertices) // 4
+                for i in range(rect_counts):
+                    for word_block in word_grid.search(
+                        annot.vertices[i * 4] + annot.vertices[i * 4 + 3]
+                    ):
+                        word_list.append(word_block[4])
+
+                for word in _fix_hyphen_broken(word_list):
+                    res.add(remove_punctuation(word))
 
     return res
 
 
-def _iterate_all_word_blocks(document):
-    """Iterate word blocks in order from the document.
+def _extract_in_worker(file_path, color, start, stop):
+    """Extract highlighted words in some pages, in a worker process.
+
+    Workers exit without running ``atexit``, so the history of words
+    queried in the worker is flushed before the result is returned.
 
     Args:
-        document (fitz.Document): the PDF document.
+        file_path (str): target file path.
+        color (str): target color name.
+        start (int): index of the first page.
+        stop (int): index after the last page.
+
+    Returns:
+        set[str]: found words.
+    """
+    res = _extract_page_range(file_path, color, start, stop)
+    flush_all()
+    return res
+
+
+def _open_document(file_path):
+    """Open a PDF file with ``PyMuPDF``, which is imported lazily.
+
+    Args:
+        file_path (str): target file path.
+
+    Returns:
+        fitz.Document: the PDF document.
+    """
+    import fitz
+
+    return fitz.open(file_path)
+
+
+def _iterate_pdf_files(paths):
+    """Iterate PDF files in given paths.
+
+    Args:
+        paths (Iterable[str]): paths to PDF files, or directories
+            containing PDF files.
 
     Yields:
-        tuple: word block.
+        str: path to a PDF file.
     """
-    for page in document:
-        for wb in sorted(page.get_text("words"), key=lambda w: (w[1], w[0])):
-            yield wb
+    for path in paths:
+        if os.path.isdir(path):
+            for file_path in sorted(pathlib.Path(path).glob("*.pdf")):
+                yield str(file_path)
+        else:
+            yield path
+
 
+class _WordGrid:
+    """Grid index of word blocks in one page.
+
+    The page is divided into square cells, and each word block is
+    bucketed into all cells it covers, so only word blocks near a
+    rectangle need to be checked.
+
+    """
 
-def _iterate_filtered_annotations(document, color):
+    def __init__(self, word_blocks, cell_size=_GRID_CELL_SIZE):
+        """Build the grid index.
+
+        Args:
+            word_blocks (list[tuple]): word blocks of the page.
+            cell_size (float): side length of grid cells.
+        """
+        self._cell_size = cell_size
+        self._word_blocks = sorted(word_blocks, key=lambda w: (w[1], w[0]))
+        self._cells = defaultdict(list)
+        for i, word_block in enumerate(self._word_blocks):
+            for cell in self._iterate_cells(word_block[:4]):
+                self._cells[cell].append(i)
+
+    def search(self, rect, threshold=0.75):
+        """Search word blocks contained by a rectangle.
+
+        Args:
+            rect (tuple): the rectangle.
+            threshold (float): threshold to control the overlap rate.
+
+        Returns:
+            list[tuple]: word blocks in reading order.
+        """
+        candidates = set()
+        for cell in self._iterate_cells(rect):
+            candidates.update(self._cells.get(cell, ()))
+
+        return [
+            self._word_blocks[i]
+            for i in sorted(candidates)
+            if _check_contain(rect, self._word_blocks[i][:4], threshold)
+        ]
+
+    def _iterate_cells(self, rect):
+        """Iterate all grid cells covered by a rectangle.
+
+        Args:
+            rect (tuple): the rectangle.
+
+        Yields:
+            tuple: column and row of the cell.
+        """
+        x1, y1, x2, y2 = (floor(v / self._cell_size) for v in rect)
+        for col in range(x1, x2 + 1):
+            for row in range(y1, y2 + 1):
+                yield col, row
+
+
+def _iterate_filtered_annotations(page, color):
     """Iterate Annotations that are highlighted by target color.
 
     Args:
-        document (fitz.Document): the document.
+        page (fitz.Page): the page.
         color (str): targeted color.
 
     Yields:
         fitz.Annot: the annotation.
     """
-    for page in document:
-        for annotation in page.annots():
-            if (
-                annotation.type[0] == PDF_ANNOT_HIGHLIGHT
-                and _get_color_name(annotation.colors["stroke"]) == color
-            ):
-                yield annotation
+    for annotation in page.annots():
+        if (
+            annotation.type[0] == PDF_ANNOT_HIGHLIGHT
+            and _get_color_name(annotation.colors["stroke"]) == color
+        ):
+            yield annotation
 
 
 def _get_color_name(rgb):
@@ -0,0 +1,168 @@
+"""One-time preparation of the database after it is downloaded.
+
+The schema is verified, indexes for lookups are created if they are
+missing, and statistics for the query planner are collected. Indexes in
+the file derived from the database, which are needed within an
+interactive latency, are built as well. Then a stamp is written next to
+the database, so that later commands only read the stamp to know the
+database is ready.
+"""
+import json
+import sqlite3
+from pathlib import Path
+
+from cmdict.completion import build_ranked_index
+from cmdict.index_db import IndexDB
+from cmdict.utils import fingerprint
+
+_COLUMNS = (
+    "id",
+    "word",
+    "sw",
+    "phonetic",
+    "definition",
+    "translation",
+    "pos",
+    "collins",
+    "oxford",
+    "tag",
+    "bnc",
+    "frq",
+    "exchange",
+)
+"""Columns of ``stardict`` needed by queries."""
+WORD_INDEX = (
+    "create index if not exists stardict_word "
+    "on stardict (word collate nocase)"
+)
+"""Index for exact lookup, if the database is shipped without one."""
+SW_INDEX = (
+    "create index if not exists stardict_sw "
+    "on stardict (sw, word collate nocase)"
+)
+"""Index for normalized lookup, if the database is shipped without one."""
+_STAMP_VERSION = 2
+"""Version of the preparation, bumped when it changes."""
+
+
+def prepare(db_path, progress=None):
+    """Prepare the database and write its stamp.
+
+    Args:
+        db_path (str, Path): to the database file.
+        progress (Callable[[str], None]): called with a description of
+            each step that modifies the database, before it starts.
+
+    Raises:
+        ValueError: when the database can not be opened, or its schema
+            is not of ECDICT.
+    """
+    db_path = Path(db_path)
+    try:
+        conn = sqlite3.connect(
+            db_path.resolve().as_uri() + "?mode=rw", uri=True
+        )
+        try:
+            _verify_schema(conn)
+            for column, sql in (("word", WORD_INDEX), ("sw", SW_INDEX)):
+                if not has_index(conn, column):
+                    if progress is not None:
+                        progress(f"Creating the index of {column}...")
+                    conn.execute(sql)
+            row = conn.execute(
+                "select 1 from sqlite_master where name = 'sqlite_stat1'"
+            ).fetchone()
+            if row is None:
+                if progress is not None:
+                    progress("Collecting statistics for queries...")
+                conn.execute("analyze")
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error as exc:
+        raise ValueError(f'Database at "{db_path}" is invalid.') from exc
+
+    # the database is not modified any more, so the file of derived
+    # indexes belongs to its final fingerprint
+    index = IndexDB(db_path)
+    try:
+        if not index.built("ranked"):
+            if progress is not None:
+                progress("Building the table for completion...")
+            index.ensure("ranked", build_ranked_index)
+    finally:
+        index.close()
+
+    stamp = {"version": _STAMP_VERSION, "fingerprint": fingerprint(db_path)}
+    with open(stamp_path(db_path), "w") as f:
+        json.dump(stamp, f)
+
+
+def is_prepared(db_path):
+    """Return if the database is prepared, by reading its stamp.
+
+    Args:
+        db_path (str, Path): to the database file.
+
+    Returns:
+        bool: if the stamp matches the database.
+    """
+    try:
+        with open(stamp_path(db_path)) as f:
+            stamp = json.load(f)
+        return stamp == {
+            "version": _STAMP_VERSION,
+            "fingerprint": fingerprint(db_path),
+        }
+    except (OSError, ValueError):
+        return False
+
+
+def stamp_path(db_path):
+    """Return the path to the stamp of a database.
+
+    Args:
+        db_path (str, Path): to the database file.
+
+    Returns:
+        Path: to the stamp next to the database.
+    """
+    db_path = Path(db_path)
+    return db_path.with_name(f".{db_path.stem}.stamp.json")
+
+
+def has_index(conn, column):
+    """Return if an index of ``stardict`` starts with a column.
+
+    Args:
+        conn (sqlite3.Connection): to the database.
+        column (str): name of the column.
+
+    Returns:
+        bool: if there is an index for lookups of the column, which is
+            case insensitive like the column.
+    """
+    row = conn.execute(
+        "select 1 from pragma_index_list('stardict') as l, "
+        "pragma_index_xinfo(l.name) as i "
+        "where i.seqno = 0 and i.name = ? and i.coll = 'NOCASE'",
+        (column,),
+    ).fetchone()
+    return row is not None
+
+
+def _verify_schema(conn):
+    """Verify columns of ``stardict`` in the database.
+
+    Args:
+        conn (sqlite3.Connection): to the database.
+
+    Raises:
+        ValueError: when the table or its columns are missing.
+    """
+    columns = [r[1] for r in conn.execute("pragma table_info('stardict')")]
+    missing = [c for c in _COLUMNS if c not in columns]
+    if missing:
+        raise ValueError(f"Columns {missing} of stardict are missing.")
+    if tuple(columns[: len(_COLUMNS)]) != _COLUMNS:
+        raise ValueError("Columns of stardict are not in order.")
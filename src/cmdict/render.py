@@ -0,0 +1,258 @@
+"""Rendering of word search results to the terminal.
+
+Results are formatted into a buffer, which is written in large chunks
+instead of one write per line. Styles are only added when the output is
+a terminal, and each styled text is reset explicitly, so that output
+redirected to a file or a pipe is plain text.
+
+Besides text, results can be rendered as records for other programs, in
+JSON Lines, TSV or CSV, with one record per word. Each record starts
+with ``query``, the word as queried, followed by the fields of its
+result, which are empty if the word is not found.
+"""
+import csv
+import json
+import sys
+
+from colorama import Fore
+from colorama import Style
+
+from cmdict.ecdict_connector import _projection
+
+_BUFFER_SIZE = 1 << 16
+"""Characters buffered before they are written."""
+_DIVIDER = "-" * 8
+_TEXT_FIELDS = ("definition", "trans")
+"""Fields with one item per line."""
+_RANK_FIELDS = ("phonetic", "collins", "oxford", "bnc", "frq")
+"""Fields echoed in one line."""
+FORMATS = ("text", "jsonl", "tsv", "csv")
+"""Formats of rendered results."""
+_TSV_ESCAPES = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+)
+"""Escapes of characters that break TSV records."""
+
+
+class Renderer:
+    """Buffered renderer of word search results.
+
+    It is used as a context manager, which writes the rest of the buffer
+    in the end.
+
+    """
+
+    def __init__(
+        self, file=None, color=None, compact=False, fmt="text", fields=None
+    ):
+        """Initialize the renderer.
+
+        Args:
+            file (TextIO, None): where results are written. Defaults to
+                be the standard output.
+            color (bool, None): if styles are added to text. Defaults to
+                be None, which adds styles only if the file is a
+                terminal.
+            compact (bool): if each result is rendered in one line of
+                text.
+            fmt (str): one of ``FORMATS``.
+            fields (Iterable[str], None): names of fields rendered, where
+                ``word`` is always included, or None for all.
+
+        Raises:
+            ValueError: when the format or a field is unknown.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Format {fmt} is unknown.")
+
+        self._file = sys.stdout if file is None else file
+        if color is None:
+            isatty = getattr(self._file, "isatty", None)
+            color = bool(isatty and isatty()) and fmt == "text"
+        self._color = color
+        self._compact = compact
+        self._format = fmt
+        self._fields = _projection(fields)
+        self._header = False
+        self._csv = (
+            csv.writer(self, lineterminator="\n") if fmt == "csv" else None
+        )
+        self._buffer = []
+        self._size = 0
+
+    def __enter__(self):
+        """Start rendering.
+
+        Returns:
+            Renderer: the renderer.
+        """
+        return self
+
+    def __exit__(self, *args):
+        """Write the rest of the buffer.
+
+        Args:
+            *args: exception, if any.
+        """
+        self.flush()
+
+    def item(self, word, res, count=None, suggestions=None):
+        """Render a word search result.
+
+        Args:
+            word (str): the word.
+            res (Mapping, None): the word search result, or None if the
+                word is not found.
+            count (int, optional): how many times the word appears.
+            suggestions (list[str], optional): similar words, if the
+                word is not found.
+        """
+        if self._format != "text":
+            self._record(word, res, count)
+        elif self._compact:
+            self.write(self._compact_item(word, res, count, suggestions))
+        else:
+            self.write(self._full_item(word, res, count, suggestions))
+
+    def flush(self):
+        """Write the buffer to the file."""
+        if self._buffer:
+            self._file.write("".join(self._buffer))
+            self._buffer = []
+            self._size = 0
+        self._file.flush()
+
+    def write(self, s):
+        """Append text to the buffer, writing it when it is full.
+
+        Args:
+            s (str): the text.
+        """
+        self._buffer.append(s)
+        self._size += len(s)
+        if self._size >= _BUFFER_SIZE:
+            self._file.write("".join(self._buffer))
+            self._buffer = []
+            self._size = 0
+
+    def _style(self, s, *styles):
+        """Add styles to text, if styles are enabled.
+
+        Args:
+            s (str): the text.
+            *styles (str): ANSI codes of the styles.
+
+        Returns:
+            str: the text in styles, followed by a reset.
+        """
+        if not self._color:
+            return s
+        return "".join(styles) + s + Style.RESET_ALL
+
+    def _full_item(self, word, res, count, suggestions):
+        """Format a result in several lines.
+
+        Args:
+            word (str): the word.
+            res (Mapping, None): the word search result.
+            count (int, None): how many times the word appears.
+            suggestions (list[str], None): similar words.
+
+        Returns:
+            str: the lines.
+        """
+        lines = [self._style(_DIVIDER, Fore.WHITE)]
+        if res:
+            lines.append(self._style(word, Fore.CYAN, Style.BRIGHT) + "\n")
+            for k in res:
+                if k not in self._fields:
+                    continue
+                if k in _TEXT_FIELDS:
+                    if res[k]:
+                        lines.append(f"    {k}: ")
+                        lines.extend(
+                            "        - " + item for item in res[k].split("\n")
+                        )
+                elif k in _RANK_FIELDS:
+                    lines.append(f"    {k}: {res[k]}")
+            if count is not None:
+                lines.append(f"    count: {count}")
+        else:
+            lines.append(
+                self._style(word, Fore.RED, Style.BRIGHT)
+                + " can not be found in the database!"
+            )
+            if suggestions:
+                lines.append(
+                    "    Did you mean: " + ", ".join(suggestions) + "?"
+                )
+        lines.append("")
+        return "\n".join(lines)
+
+    def _compact_item(self, word, res, count, suggestions):
+        """Format a result in one line.
+
+        Args:
+            word (str): the word.
+            res (Mapping, None): the word search result.
+            count (int, None): how many times the word appears.
+            suggestions (list[str], None): similar words.
+
+        Returns:
+            str: the line.
+        """
+        parts = [self._style(word, Fore.CYAN, Style.BRIGHT)]
+        if count is not None:
+            parts.append(f"({count})")
+        if res:
+            res = {k: v for k, v in res.items() if k in self._fields}
+            if res.get("phonetic"):
+                parts.append(f"[{res['phonetic']}]")
+            text = res.get("trans") or res.get("definition")
+            if text:
+                parts.append("; ".join(text.split("\n")))
+        else:
+            parts[0] = self._style(word, Fore.RED, Style.BRIGHT)
+            parts.append("-")
+            if suggestions:
+                parts.append("(" + ", ".join(suggestions) + "?)")
+        return " ".join(parts) + "\n"
+
+    def _record(self, word, res, count):
+        """Format a result as a record.
+
+        The header of TSV or CSV is written before the first record,
+        with ``count`` if the first record has a count.
+
+        Args:
+            word (str): the word.
+            res (Mapping, None): the word search result.
+            count (int, None): how many times the word appears.
+        """
+        record = {"query": word}
+        for k in self._fields:
+            record[k] = res[k] if res else None
+        if count is not None:
+            record["count"] = count
+
+        if self._format == "jsonl":
+            self.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return
+
+        if not self._header:
+            self._header = True
+            self._row(list(record))
+        self._row(["" if v is None else str(v) for v in record.values()])
+
+    def _row(self, values):
+        """Format a row of TSV or CSV.
+
+        Args:
+            values (list[str]): values in the row.
+        """
+        if self._csv is not None:
+            self._csv.writerow(values)
+        else:
+            self.write(
+                "\t".join(v.translate(_TSV_ESCAPES) for v in values) + "\n"
+            )
@@ -0,0 +1,90 @@
+"""Reverse search of headwords by their translations or definitions.
+
+Translations and definitions are indexed by a FTS5 table. Chinese
+characters are not separated by spaces, so they are spaced out before
+being indexed, and a Chinese phrase is searched as a phrase of single
+characters.
+"""
+import re
+
+_BATCH_SIZE = 20000
+"""Number of headwords indexed in one transaction."""
+_CJK = re.compile(
+    "([\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\U00020000-\U0002fa1f])"
+)
+"""Chinese characters, which are indexed one by one."""
+_WEIGHTS = (10.0, 1.0)
+"""Weights of translations and definitions in ranking by ``bm25``."""
+
+
+def build_reverse_batch(conn, last_id):
+    """Index translations and definitions of a batch of headwords.
+
+    Args:
+        conn (sqlite3.Connection): to the index file, where the database
+            is attached as ``src``.
+        last_id (int): id of the last indexed headword.
+
+    Returns:
+        tuple: id of the last headword in the batch, and the number of
+            headwords in the batch.
+    """
+    conn.execute(
+        "create virtual table if not exists reverse using fts5"
+        "(word unindexed, frq unindexed, trans, definition, "
+        "tokenize = 'unicode61')"
+    )
+    rows = conn.execute(
+        "select id, word, frq, translation, definition from src.stardict "
+        "where id > ? order by id limit ?",
+        (last_id, _BATCH_SIZE),
+    ).fetchall()
+    conn.executemany(
+        "insert into reverse (rowid, word, frq, trans, definition) "
+        "values (?, ?, ?, ?, ?)",
+        (
+            (id_, word, frq, _space_cjk(trans), _space_cjk(definition))
+            for id_, word, frq, trans, definition in rows
+        ),
+    )
+    return (rows[-1][0] if rows else last_id), len(rows)
+
+
+def reverse(index, phrase, limit=10):
+    """Search headwords by a Chinese or English phrase.
+
+    Args:
+        index (IndexDB): index file with the FTS5 table.
+        phrase (str): words in translations or definitions, which are
+            all required.
+        limit (int): maximum number of headwords.
+
+    Returns:
+        list[str]: headwords ranked by ``bm25``, then frequency.
+    """
+    terms = [
+        '"' + _space_cjk(term).replace('"', '""') + '"'
+        for term in phrase.split()
+    ]
+    if not terms or limit <= 0:
+        return []
+
+    rows = index.execute(
+        "select word from reverse where reverse match ? "
+        "order by bm25(reverse, 0.0, 0.0, ?, ?), "
+        "coalesce(frq, 0) = 0, frq limit ?",
+        (" ".join(terms),) + _WEIGHTS + (limit,),
+    )
+    return [w for (w,) in rows]
+
+
+def _space_cjk(text):
+    """Separate Chinese characters by spaces.
+
+    Args:
+        text (str, None): the text.
+
+    Returns:
+        str: the text, where each Chinese character is a token.
+    """
+    return _CJK.sub(r" \1 ", text) if text else ""
@@ -1,30 +1,64 @@
 """Functions for searching in command line."""
 import os
 import pathlib
-import zipfile
+import signal
+from collections import Counter
+from itertools import chain
 
 import click
-import requests
-import yaml
 from colorama import Fore
 from colorama import init as _init_colorama
 from colorama import Style
-from tqdm import tqdm
-from trogon import tui
 
+from cmdict.compact import CompactConnector
+from cmdict.compact import compile_db
+from cmdict.daemon import Client as DaemonClient
+from cmdict.daemon import DAEMON_FEATURES
+from cmdict.daemon import serve as serve_daemon
+from cmdict.daemon import SOCKET_PATH
+from cmdict.downloader import download as download_db
+from cmdict.ecdict_connector import _projection
 from cmdict.ecdict_connector import ECDICTConnector
-from cmdict.pdf_tools import extract_words
+from cmdict.pdf_tools import extract_words_from_paths
 from cmdict.pdf_tools import PDF_FEATURES
-from cmdict.txt_tools import scan_words
+from cmdict.prepare import is_prepared
+from cmdict.prepare import prepare as prepare_db
+from cmdict.render import FORMATS
+from cmdict.render import Renderer
+from cmdict.txt_tools import count_words
+from cmdict.txt_tools import iter_lines
+from cmdict.txt_tools import iter_words
+from cmdict.utils import batched
+from cmdict.utils import fingerprint
 
 DB_URL = "https://github.com/skywind3000/ECDICT/releases/download/1.0.28/ecdict-sqlite-28.zip"  # noqa: E501
-DB_VALID_SIZE = (851288064, 17408)  # (full size, test size)
+_SCAN_BATCH_SIZE = 5000
+"""Number of scanned words looked up in the database at a time."""
+_SCAN_CACHE_SIZE = 20000
+"""Number of query results cached across batches of scanned words."""
+_SERVE_CACHE_SIZE = 20000
+"""Number of query results cached by the daemon."""
+_SORT_KEYS = ("count", "frq", "bnc")
+"""Keys to sort distinct scanned words."""
+_COMPLETE_LIMIT = 50
+"""Number of headwords offered by shell completion."""
+_DISPLAY_FIELDS = (
+    "phonetic",
+    "definition",
+    "trans",
+    "collins",
+    "oxford",
+    "bnc",
+    "frq",
+)
+"""Fields echoed for each word, which are the only ones fetched."""
 
 _init_colorama(autoreset=True)
 
 _db_dir = os.path.join(str(pathlib.Path(__file__).parent), "data")
 _db_file = os.path.join(_db_dir, "stardict.db")
 _db_path = pathlib.Path(_db_file)
+_cdb_path = _db_path.with_suffix(".cdb")
 
 
 class ActiveFlagCommand(click.Group):
@@ -51,97 +85,496 @@ class ActiveFlagCommand(click.Group):
             return lambda f: f
 
 
-@tui()
 @click.group(cls=ActiveFlagCommand)
 def cli():
     """Command line interface."""
 
 
+@cli.command(help="Open Textual TUI.")
+@click.pass_context
+def tui(ctx):
+    """Open Textual TUI, where ``trogon`` is imported lazily.
+
+    Args:
+        ctx (click.Context): context of the command.
+    """
+    from trogon import Trogon
+
+    Trogon(cli, command_name="tui", click_context=ctx).run()
+
+
 @cli.command()
-def download():
-    """Download necessary database before using cmdict."""
+@click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    help="How many ranges are downloaded in parallel, resuming a former "
+    "run, instead of streaming.",
+    show_default=True,
+)
+@click.option("--sha256", help="Expected SHA-256 of the zip file.")
+def download(jobs, sha256):
+    """Download necessary database before using cmdict.
+
+    Args:
+        jobs (int): number of ranges downloaded in parallel.
+        sha256 (str, None): expected SHA-256 of the zip file in hex.
+    """
     # check if data folder needs to be created
     data_dir_path = pathlib.Path(_db_dir)
     if not data_dir_path.exists():
         data_dir_path.mkdir(parents=True)
 
-    db_zip = os.path.join(_db_dir, "stardict.zip")
+    _echo_divider()
+    if _valid_db_exists():
+        _echo_ready()
+        return
+
+    from tqdm import tqdm
+
+    try:
+        click.echo("Downloading the dictionary...")
+        with tqdm(unit="iB", unit_scale=True) as t:
+
+            def _progress(done, total):
+                """Update the progress bar.
+
+                Args:
+                    done (int): bytes downloaded so far.
+                    total (int, None): size of the zip file.
+                """
+                t.total = total
+                t.update(done - t.n)
+
+            download_db(
+                DB_URL,
+                _db_path,
+                sha256=sha256,
+                jobs=jobs,
+                progress=_progress,
+            )
 
+        click.echo("Preparing the dictionary...")
+        prepare_db(_db_path, progress=click.echo)
+        _echo_ready()
+    except Exception:
+        click.echo(
+            "\n"
+            + Fore.RED
+            + Style.BRIGHT
+            + "Something went wrong! Please try again."
+        )
+
+
+@cli.command()
+def prepare():
+    """Verify the database, and create indexes and statistics once.
+
+    It is run by ``download``, or after the database is replaced.
+    """
+    _echo_divider()
+    if not _db_path.is_file():
+        _echo_warn_download()
+        return
+
+    try:
+        prepare_db(_db_path, progress=click.echo)
+        _echo_ready()
+    except ValueError as exc:
+        click.echo(Fore.RED + Style.BRIGHT + str(exc))
+
+
+@cli.command(name="compile")
+def compile_():
+    """Compile the database into a compact file for faster searches.
+
+    Searches use the compact file as long as the database is unchanged.
+    """
     _echo_divider()
     if _valid_db_exists():
+        click.echo("Compiling the dictionary...")
+        compile_db(_db_path, _cdb_path)
         _echo_ready()
     else:
-        try:
-            click.echo("Downloading the dictionary...")
-            r = requests.get(DB_URL, stream=True)
-            total_size = int(r.headers.get("content-length", 0))
-            block_size = 1024
-
-            with tqdm(total=total_size, unit="iB", unit_scale=True) as t, open(
-                db_zip, "wb"
-            ) as f:
-                for data in r.iter_content(block_size):
-                    t.update(len(data))
-                    f.write(data)
-
-            with zipfile.ZipFile(db_zip, "r") as ref:
-                ref.extractall(_db_dir)
-
-            _echo_ready()
-        except Exception:
-            click.echo(
-                "\n"
-                + Fore.RED
-                + Style.BRIGHT
-                + "Something went wrong! Please try again."
-            )
-        finally:
-            zip_path = pathlib.Path(db_zip)
-            if zip_path.is_file():
-                zip_path.unlink()
-            if (
-                _db_path.is_file()
-                and _db_path.stat().st_size not in DB_VALID_SIZE
-            ):
-                _db_path.unlink()
+        _echo_warn_download()
+
+
+def _complete_words(ctx, param, incomplete):
+    """Complete a word in the shell with headwords in the database.
+
+    Args:
+        ctx (click.Context): context of the command.
+        param (click.Parameter): the argument to be completed.
+        incomplete (str): prefix typed so far.
+
+    Returns:
+        list[str]: headwords starting with the prefix.
+    """
+    if not _valid_db_exists():
+        return []
+    return (
+        ECDICTConnector(_db_path).complete(incomplete, _COMPLETE_LIMIT) or []
+    )
+
+
+def _parse_fields(ctx, param, value):
+    """Parse names of fields separated by commas.
+
+    Args:
+        ctx (click.Context): context of the command.
+        param (click.Parameter): the option of fields.
+        value (str, None): names of fields, such as "phonetic,trans".
+
+    Returns:
+        tuple[str]: names of fields, or the fields echoed by default if
+            the option is not given.
+
+    Raises:
+        BadParameter: when a field is unknown.
+    """
+    if value is None:
+        return _DISPLAY_FIELDS
+
+    fields = tuple(f.strip() for f in value.split(",") if f.strip())
+    try:
+        _projection(fields)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc)) from None
+    return fields
+
+
+def _output_options(command):
+    """Add options of the output format and fields to a command.
+
+    Args:
+        command (Callable): function of the command.
+
+    Returns:
+        Callable: function of the command with the options.
+    """
+    command = click.option(
+        "--fields",
+        callback=_parse_fields,
+        help="Fields to echo, separated by commas, such as phonetic,trans.",
+    )(command)
+    return click.option(
+        "--format",
+        "fmt",
+        type=click.Choice(FORMATS),
+        default="text",
+        show_default=True,
+        help="Format to echo, where others than text have a record per line.",
+    )(command)
 
 
 @cli.command()
-@click.argument("words", nargs=-1)
-def search(words):
+@click.argument("words", nargs=-1, shell_complete=_complete_words)
+@click.option(
+    "--normalize",
+    "-n",
+    is_flag=True,
+    help="Fall back to words in lowercase without punctuation.",
+)
+@click.option(
+    "--lemma",
+    "-l",
+    is_flag=True,
+    help="Resolve inflected forms to their headwords.",
+)
+@click.option(
+    "--suggest",
+    "-s",
+    is_flag=True,
+    help="Suggest similar words for words not found.",
+)
+@click.option(
+    "--from-file",
+    "-f",
+    "from_file",
+    type=click.Path(exists=True, dir_okay=False, allow_dash=True),
+    help="Read words from a file with one word per line, - for stdin.",
+)
+@_output_options
+def search(words, normalize, lemma, suggest, from_file, fmt, fields):
     """Type in one English word and echo its Chinese translation.
 
+    Words read from a file are searched in batches, and results are
+    echoed in the order of words, batch by batch.
+
     Args:
         words (str): one English word to be searched. For example,
             "a lot" or "mirror".
+        normalize (bool): if words without an exact match are searched
+            in lowercase without punctuation.
+        lemma (bool): if inflected forms are resolved to headwords.
+        suggest (bool): if similar words are suggested for words not
+            found, which builds an index the first time. They are only
+            echoed in text.
+        from_file (str, None): path to a file with one word per line,
+            which can be compressed by gzip or bzip2, or ``-`` for
+            standard input. Its words are searched after ``words``.
+        fmt (str): format to echo results.
+        fields (tuple[str]): fields to echo.
     """
     if _valid_db_exists():
-        db_engine = ECDICTConnector()
+        if from_file is None:
+            batches = [list(words)]
+        else:
+            batches = batched(
+                chain(words, iter_lines(from_file)), _SCAN_BATCH_SIZE
+            )
+
+        use_daemon = not (normalize or lemma)
+        db_engine = suggester = None
+        renderer = Renderer(fmt=fmt, fields=fields)
+        with renderer, DaemonClient() as client:
+            for words in batches:
+                res = None
+                if use_daemon:
+                    res = client.query_many(words, fields=fields)
+                    # without a daemon, later batches do not try again
+                    use_daemon = res is not None
+                if res is None:
+                    if db_engine is None:
+                        db_engine = _open_connector(
+                            _SCAN_CACHE_SIZE if from_file else 0,
+                            compact=not (normalize or lemma),
+                        )
+                    if lemma:
+                        lemmas = db_engine.lemmatize(words)
+                        words = [lemmas[w] for w in words]
+                    res = db_engine.query_many(words, normalize, fields)
+
+                suggestions = {}
+                missing = [w for w in words if not res[w]]
+                if suggest and missing and fmt == "text":
+                    if suggester is None:
+                        suggester = ECDICTConnector(_db_path)
+                    suggestions = {w: suggester.suggest(w) for w in missing}
+                for word in words:
+                    renderer.item(
+                        word, res[word], suggestions=suggestions.get(word)
+                    )
+    else:
+        _echo_warn_download()
+
+
+@cli.command(name="reverse")
+@click.argument("phrase", nargs=-1, required=True)
+@click.option(
+    "--limit",
+    default=10,
+    help="Maximum number of English words.",
+    show_default=True,
+)
+def reverse_(phrase, limit):
+    """Search English words by a Chinese or English phrase.
+
+    The phrase is searched in translations and definitions, by a full
+    text index built the first time.
+
+    Args:
+        phrase (tuple[str]): words in the phrase, such as "苹果".
+        limit (int): maximum number of English words.
+    """
+    if not _valid_db_exists():
+        _echo_warn_download()
+        return
+
+    bar = None
+
+    def _progress(n):
+        """Show progress of building the full text index.
+
+        Args:
+            n (int): number of words indexed in a batch.
+        """
+        nonlocal bar
+        if bar is None:
+            from tqdm import tqdm
+
+            click.echo("Indexing the dictionary...")
+            bar = tqdm(unit="word", unit_scale=True)
+        bar.update(n)
+
+    db_engine = ECDICTConnector(_db_path)
+    words = db_engine.reverse(" ".join(phrase), limit, _progress) or []
+    if bar is not None:
+        bar.close()
+
+    res = db_engine.query_many(words, fields=_DISPLAY_FIELDS)
+    with Renderer() as renderer:
         for word in words:
-            _echo_item(word, db_engine.query(word))
+            renderer.item(word, res[word])
+        if not words:
+            renderer.item(" ".join(phrase), None)
+
+
+@cli.command(active=DAEMON_FEATURES)
+@click.option(
+    "--socket",
+    "socket_path",
+    default=SOCKET_PATH,
+    help="Path to the Unix domain socket.",
+    show_default=True,
+)
+def serve(socket_path):
+    """Serve searches from a daemon that keeps the database open.
+
+    ``search`` uses the daemon when it is running, to avoid opening the
+    database for every search.
+
+    Args:
+        socket_path (str): path to the Unix domain socket.
+    """
+    if _valid_db_exists():
+        _echo_divider()
+        click.echo(f"Serving on {socket_path}, press Ctrl+C to stop.")
+        # stop like Ctrl+C when terminated, so the socket is removed
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            serve_daemon(_open_connector(_SERVE_CACHE_SIZE), socket_path)
+        except KeyboardInterrupt:
+            pass
     else:
         _echo_warn_download()
 
 
 @cli.command()
-@click.argument("txt_path", type=click.Path(exists=True))
-def scan(txt_path):
+@click.argument("txt_path", type=click.Path(exists=True, allow_dash=True))
+@click.option(
+    "--unique",
+    "-u",
+    is_flag=True,
+    help="Echo each distinct word once with its count.",
+)
+@click.option(
+    "--sort",
+    "sort_by",
+    type=click.Choice(_SORT_KEYS),
+    help="Sort distinct words by count in the file, or by a rank.",
+)
+@click.option("--min-bnc", type=int, help="Minimum BNC rank of words.")
+@click.option("--max-bnc", type=int, help="Maximum BNC rank of words.")
+@click.option("--min-frq", type=int, help="Minimum frequency rank of words.")
+@click.option("--max-frq", type=int, help="Maximum frequency rank of words.")
+@click.option(
+    "--normalize",
+    "-n",
+    is_flag=True,
+    help="Fall back to words in lowercase without punctuation.",
+)
+@click.option(
+    "--lemma",
+    "-l",
+    is_flag=True,
+    help="Resolve inflected forms to their headwords.",
+)
+@click.option(
+    "--compact",
+    "-c",
+    is_flag=True,
+    help="Echo each word in one line.",
+)
+@_output_options
+def scan(
+    txt_path,
+    unique,
+    sort_by,
+    min_bnc,
+    max_bnc,
+    min_frq,
+    max_frq,
+    normalize,
+    lemma,
+    compact,
+    fmt,
+    fields,
+):
     """Scan all words in a txt file and return search results.
 
+    Sorting or filtering by ranks implies ``--unique``. Words without
+    a rank are sorted last, and they are dropped by rank filters. With
+    ``--lemma``, inflected forms are counted as their headwords.
+
     Args:
-        txt_path (str): path to the txt file.
+        txt_path (str): path to the txt file, which can be compressed by
+            gzip or bzip2, or ``-`` for standard input.
+        unique (bool): if each distinct word is echoed only once.
+        sort_by (str, None): how distinct words are sorted.
+        min_bnc (int, None): minimum BNC rank of echoed words.
+        max_bnc (int, None): maximum BNC rank of echoed words.
+        min_frq (int, None): minimum frequency rank of echoed words.
+        max_frq (int, None): maximum frequency rank of echoed words.
+        normalize (bool): if words without an exact match are searched
+            in lowercase without punctuation.
+        lemma (bool): if inflected forms are resolved to headwords.
+        compact (bool): if each word is echoed in one line.
+        fmt (str): format to echo results, where records are streamed
+            in batches unless words are distinct.
+        fields (tuple[str]): fields to echo.
     """
-    if _valid_db_exists():
-        db_engine = ECDICTConnector()
-        words = scan_words(txt_path)
-        for i, word in enumerate(words):
-            _echo_item(word, db_engine.query(word))
-    else:
+    if not _valid_db_exists():
         _echo_warn_download()
+        return
+
+    db_engine = _open_connector(
+        _SCAN_CACHE_SIZE, compact=not (normalize or lemma)
+    )
+    bounds = {
+        "bnc": (min_bnc, max_bnc),
+        "frq": (min_frq, max_frq),
+    }
+    bounds = {k: v for k, v in bounds.items() if v != (None, None)}
+
+    renderer = Renderer(compact=compact, fmt=fmt, fields=fields)
+
+    if not (unique or sort_by or bounds):
+        with renderer:
+            for words in batched(iter_words(txt_path), _SCAN_BATCH_SIZE):
+                if lemma:
+                    lemmas = db_engine.lemmatize(words)
+                    words = [lemmas[w] for w in words]
+                res = db_engine.query_many(words, normalize, fields)
+                for word in words:
+                    renderer.item(word, res[word])
+        return
+
+    counts = count_words(txt_path)
+    if lemma:
+        headwords = Counter()
+        first = {}
+        for words in batched(counts, _SCAN_BATCH_SIZE):
+            lemmas = db_engine.lemmatize(words)
+            for word in words:
+                headword = lemmas[word]
+                headword = first.setdefault(headword.lower(), headword)
+                headwords[headword] += counts[word]
+        counts = headwords
+
+    # ranks for filters and sorting are fetched, even if not echoed
+    fields += tuple(bounds)
+    if sort_by in ("bnc", "frq"):
+        fields += (sort_by,)
+    res = {}
+    for words in batched(counts, _SCAN_BATCH_SIZE):
+        res.update(db_engine.query_many(words, normalize, fields))
+
+    words = [w for w in counts if _within_bounds(res[w], bounds)]
+    if sort_by == "count":
+        words.sort(key=lambda w: -counts[w])
+    elif sort_by:
+        words.sort(key=lambda w: _rank_key(res[w], sort_by))
+
+    with renderer:
+        for word in words:
+            renderer.item(word, res[word], count=counts[word])
 
 
 @cli.command(active=PDF_FEATURES)
-@click.argument("pdf_path", type=click.Path(exists=True))
+@click.argument(
+    "pdf_paths", nargs=-1, required=True, type=click.Path(exists=True)
+)
 @click.option(
     "--color",
     default="yellow",
@@ -151,13 +584,40 @@ def scan(txt_path):
 @click.option(
     "--save", "-s", is_flag=True, help="Whether to save extracted words."
 )
-def extract(pdf_path, color, save):
-    """Extract highlighted words with specified color in a PDF file.
+@click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    help="How many processes extract pages in parallel, 0 for all CPUs.",
+    show_default=True,
+)
+@click.option(
+    "--normalize",
+    "-n",
+    is_flag=True,
+    help="Fall back to words in lowercase without punctuation.",
+)
+@click.option(
+    "--compact",
+    "-c",
+    is_flag=True,
+    help="Echo each word in one line.",
+)
+@_output_options
+def extract(pdf_paths, color, save, jobs, normalize, compact, fmt, fields):
+    """Extract highlighted words with specified color in PDF files.
 
     Args:
-        pdf_path (str): path to the PDF file.
+        pdf_paths (tuple[str]): paths to PDF files, or directories
+            containing PDF files.
         color (str): three numbers ranging between 0 and 1.
         save (bool): if extracted words will be saved in yaml file.
+        jobs (int): number of processes to extract pages in parallel.
+        normalize (bool): if words without an exact match are searched
+            in lowercase without punctuation.
+        compact (bool): if each word is echoed in one line.
+        fmt (str): format to echo results.
+        fields (tuple[str]): fields to echo.
 
     Raises:
         ImportError: when the features for PDF are not enabled, most
@@ -167,65 +627,101 @@ def extract(pdf_path, color, save):
         raise ImportError("The features for PDF are not enabled.")
 
     if _valid_db_exists():
-        db_engine = ECDICTConnector()
-        words = extract_words(pdf_path, color)
+        words = extract_words_from_paths(pdf_paths, color, jobs)
 
         if save:
+            import yaml
+
             with open(_db_dir + "/.extraction.yaml", "w") as f:
                 yaml.safe_dump(list(words), f)
 
-        for i, word in enumerate(words):
-            _echo_item(word, db_engine.query(word))
+        res = _open_connector(compact=not normalize).query_many(
+            words, normalize, fields
+        )
+        with Renderer(compact=compact, fmt=fmt, fields=fields) as renderer:
+            for word in words:
+                renderer.item(word, res[word])
     else:
         _echo_warn_download()
 
 
-def _tab_echo(s, tabs=4):
-    """Echo via click with tabs at the beginning.
+def _within_bounds(res, bounds):
+    """Return if ranks of a word search result are within bounds.
 
     Args:
-        s (str): The string.
-        tabs (int, optional): Tabs before the string. Defaults to 4.
+        res (dict): The word search result.
+        bounds (dict): Minimum and maximum of each rank, where None
+            means no limit.
+
+    Returns:
+        bool: if all ranks are within bounds. Words not found or without
+            a rank are out of bounds, unless there is no bound.
     """
-    click.echo(tabs * " " + s)
+    if not bounds:
+        return True
+    if not res:
+        return False
+
+    for k, (lower, upper) in bounds.items():
+        if not res[k]:
+            return False
+        if lower is not None and res[k] < lower:
+            return False
+        if upper is not None and res[k] > upper:
+            return False
+    return True
 
 
-def _echo_item(word, res):
-    """Echo word search result to cli.
+def _rank_key(res, k):
+    """Return the key to sort word search results by a rank.
 
     Args:
-        word (str): The word.
         res (dict): The word search result.
+        k (str): Name of the rank.
+
+    Returns:
+        tuple: sort key, where words not found or without a rank are
+            placed last.
     """
-    _echo_divider()
-    if res:
-        click.echo(Fore.CYAN + Style.BRIGHT + word + "\n")
-        for k in res:
-            if k in ("definition", "trans"):
-                if res[k]:
-                    items = res[k].split("\n")
-                    _tab_echo(str(k) + ": ")
-                    for item in items:
-                        _tab_echo("- " + item, tabs=8)
-            elif k in ("phonetic", "collins", "oxford", "bnc", "frq"):
-                _tab_echo(str(k) + ": " + str(res[k]))
-    else:
-        click.echo(
-            Fore.RED
-            + Style.BRIGHT
-            + word
-            + Style.RESET_ALL
-            + " can not be found in the database!"
-        )
+    if not res or not res[k]:
+        return (1, 0)
+    return (0, res[k])
+
+
+def _open_connector(cache_size=0, compact=True):
+    """Open the compact file if it is compiled from the current database.
+
+    Args:
+        cache_size (int): maximum number of query results cached when
+            the database is opened instead.
+        compact (bool): if the compact file can be used, which does not
+            support normalized lookup or lemmatization.
+
+    Returns:
+        CompactConnector, ECDICTConnector: connector to search words.
+    """
+    if compact and _cdb_path.is_file():
+        try:
+            connector = CompactConnector(_cdb_path)
+        except ValueError:
+            pass
+        else:
+            if connector.source == fingerprint(_db_path):
+                return connector
+            connector.close()
+    return ECDICTConnector(_db_path, cache_size=cache_size)
 
 
 def _valid_db_exists():
-    """Return if a valid database is found.
+    """Return if a prepared database is found.
+
+    Only the stamp written by ``prepare`` is read, and the database is
+    never modified, so that it is cheap for every command.
 
     Returns:
-        bool: if a valid database is found.
+        bool: if a prepared database is found.
     """
-    return _db_path.is_file() and _db_path.stat().st_size in DB_VALID_SIZE
+    return _db_path.is_file() and is_prepared(_db_path)
 
 
 def _echo_divider():
@@ -234,13 +730,20 @@ def _echo_divider():
 
 
 def _echo_warn_download():
-    """Echo cmdict needs download before use."""
+    """Echo cmdict needs download or preparation before use."""
     _echo_divider()
-    click.echo(
-        Fore.RED
-        + Style.BRIGHT
-        + "Database does not exist! Please download: `cmdict download`."
-    )
+    if _db_path.is_file():
+        click.echo(
+            Fore.RED
+            + Style.BRIGHT
+            + "Database is not prepared! Please prepare: `cmdict prepare`."
+        )
+    else:
+        click.echo(
+            Fore.RED
+            + Style.BRIGHT
+            + "Database does not exist! Please download: `cmdict download`."
+        )
 
 
 def _echo_ready():
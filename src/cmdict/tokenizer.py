@@ -0,0 +1,62 @@
+"""Functions to split text into words without punctuation."""
+import string
+import unicodedata
+
+SPECIAL_CHARS = "“”"
+"""Punctuation beyond ``string.punctuation`` that is used frequently."""
+
+
+class _PunctuationTable(dict):
+    """Translation table to remove all kinds of punctuation.
+
+    ASCII punctuation is removed from the start. Other characters are
+    classified by their Unicode category when they are first seen, and
+    the result is kept in the table for later translations.
+
+    """
+
+    def __missing__(self, key):
+        """Classify a character that is not in the table yet.
+
+        Args:
+            key (int): Unicode code point of the character.
+
+        Returns:
+            int, None: the same code point to keep the character, or
+                None to remove it as punctuation.
+        """
+        value = None if unicodedata.category(chr(key))[0] == "P" else key
+        self[key] = value
+        return value
+
+
+_TABLE = _PunctuationTable(
+    str.maketrans("", "", string.punctuation + SPECIAL_CHARS)
+)
+
+
+def remove_punctuation(s):
+    """Remove all kinds of punctuations in the string.
+
+    Args:
+        s (str): to be removed from punctuations.
+
+    Returns:
+        str: with all kinds of punctuation removed.
+    """
+    return s.translate(_TABLE)
+
+
+def tokenize(text):
+    """Split a text into words without punctuation.
+
+    The whole text is cleaned in one pass before being split, so tokens
+    that are only punctuation are dropped.
+
+    Args:
+        text (str): to be split.
+
+    Returns:
+        list[str]: words with all kinds of punctuation removed.
+    """
+    return text.translate(_TABLE).split()
@@ -1,5 +1,14 @@
 """Functions for reading words in txt files."""
-from cmdict.utils import remove_punctuation
+import bz2
+import gzip
+import sys
+from collections import Counter
+from contextlib import nullcontext
+
+from cmdict.tokenizer import tokenize
+
+_CHUNK_SIZE = 1 << 16
+"""Number of characters read from a txt file at a time."""
 
 
 def scan_words(txt_path):
@@ -11,8 +20,100 @@ def scan_words(txt_path):
     Returns:
         list: containing all English words without any punctuation.
     """
-    with open(txt_path, "r") as f:
-        all_text = f.read()
-        words = all_text.split()
-    words = [remove_punctuation(w) for w in words]
-    return words
+    return list(iter_words(txt_path))
+
+
+def count_words(txt_path):
+    """Count frequencies of all words in a txt file, ignoring case.
+
+    Words differing only in case, such as "Play" and "play", are counted
+    as the one appearing first. Memory grows with the number of distinct
+    words, instead of the size of the file.
+
+    Args:
+        txt_path (str): to the txt file, or ``-`` for standard input.
+
+    Returns:
+        Counter: frequency of each word, in the order of first
+            appearance.
+    """
+    counts = Counter()
+    first = {}
+    for word in iter_words(txt_path):
+        counts[first.setdefault(word.lower(), word)] += 1
+    return counts
+
+
+def iter_words(txt_path, chunk_size=_CHUNK_SIZE):
+    """Iterate all words in a txt file with constant memory.
+
+    The file is read in chunks, and each chunk is split by
+    ``tokenize``. Text after the last whitespace of a chunk may continue
+    in the next chunk, so it is carried over, and words are the same as
+    if the whole file were split at once. Files ending with ``.gz`` or
+    ``.bz2`` are decompressed on the fly.
+
+    Args:
+        txt_path (str): to the txt file, or ``-`` for standard input.
+        chunk_size (int): number of characters read at a time.
+
+    Yields:
+        str: English word without any punctuation.
+    """
+    with _open_txt(txt_path) as f:
+        tail = ""
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+
+            text = tail + chunk
+            if text[-1].isspace():
+                tail = ""
+            else:
+                parts = text.rsplit(None, 1)
+                text, tail = parts if len(parts) == 2 else ("", parts[0])
+
+            yield from tokenize(text)
+
+        yield from tokenize(tail)
+
+
+def iter_lines(txt_path):
+    """Iterate words in a txt file with one word per line.
+
+    Lines are read one at a time, so the file can be larger than memory.
+    Words may contain spaces, such as "a lot", and blank lines are
+    skipped.
+
+    Args:
+        txt_path (str): to the txt file, or ``-`` for standard input.
+
+    Yields:
+        str: word in a line, without spaces around it.
+    """
+    with _open_txt(txt_path) as f:
+        for line in f:
+            word = line.strip()
+            if word:
+                yield word
+
+
+def _open_txt(txt_path):
+    """Open a txt file for reading in text mode.
+
+    Args:
+        txt_path (str): to the txt file, or ``-`` for standard input.
+
+    Returns:
+        ContextManager[TextIO]: the opened file.
+    """
+    if txt_path == "-":
+        # do not close standard input when leaving the context
+        return nullcontext(sys.stdin)
+    elif txt_path.endswith(".gz"):
+        return gzip.open(txt_path, "rt")
+    elif txt_path.endswith(".bz2"):
+        return bz2.open(txt_path, "rt")
+    else:
+        return open(txt_path, "r")
@@ -1,17 +1,60 @@
 """Utility functions."""
-import string
+import os
+from itertools import islice
 
-SPECIAL_CHARS = "“”"
+from cmdict.tokenizer import remove_punctuation
+from cmdict.tokenizer import SPECIAL_CHARS
 
+__all__ = [
+    "SPECIAL_CHARS",
+    "batched",
+    "fingerprint",
+    "log_exception",
+    "remove_punctuation",
+]
 
-def remove_punctuation(s):
-    """Remove all kinds of punctuations in the string.
+
+def batched(iterable, size):
+    """Split an iterable into lists of a fixed size.
+
+    Args:
+        iterable (Iterable): to be split.
+        size (int): size of each list, except the last one.
+
+    Yields:
+        list: next items in the iterable.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def fingerprint(path):
+    """Identify the version of a file by its size and modification time.
 
     Args:
-        s (str): to be removed from punctuations.
+        path (str, Path): to the file.
 
     Returns:
-        str: with all kinds of punctuation removed.
+        str: fingerprint of the file, which changes when the file is
+            replaced or modified.
     """
-    table = str.maketrans("", "", string.punctuation + SPECIAL_CHARS)
-    return s.translate(table)
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def log_exception(message):
+    """Log the exception being handled with ``loguru``.
+
+    ``loguru`` is imported lazily, because it is slow to import and only
+    needed when something goes wrong.
+
+    Args:
+        message (str, Exception): to be logged with the traceback.
+    """
+    from loguru import logger
+
+    logger.opt(depth=1).exception(message)
@@ -0,0 +1,141 @@
+"""Test AsyncECDICTConnector."""
+import asyncio
+import threading
+
+import pytest
+
+from cmdict.async_connector import AsyncECDICTConnector
+from cmdict.ecdict_connector import ECDICTConnector
+
+
+def test_no_file_connect():
+    """Test database connection when .db file doesn't exist."""
+    with pytest.raises(ValueError):
+        _ = AsyncECDICTConnector("./no_such_file")
+
+
+def test_async_query():
+    """Test results are the same as the synchronous connector."""
+
+    async def _query():
+        """Query words concurrently.
+
+        Returns:
+            tuple: results of concurrent queries.
+        """
+        async with AsyncECDICTConnector(pool_size=2) as connector:
+            return await asyncio.gather(
+                connector.query("play"),
+                connector.query("notaword"),
+                connector.query_many(["apple", "Level", "apple"]),
+            )
+
+    play, notaword, many = asyncio.run(_query())
+    expected = ECDICTConnector().query_many(
+        ["play", "notaword", "apple", "Level"]
+    )
+    assert play == expected["play"] and notaword is None
+    assert many == {"apple": expected["apple"], "Level": expected["Level"]}
+
+
+def test_async_query_coalescing(monkeypatch):
+    """Test concurrent queries of the same word share one lookup.
+
+    Args:
+        monkeypatch (MonkeyPatch): pytest tool to count lookups.
+    """
+    queried = []
+    query_many = ECDICTConnector.query_many
+
+    def _query_many(self, words):
+        """Count queried words.
+
+        Args:
+            self (ECDICTConnector): the connector.
+            words (list[str]): the words to be queried.
+
+        Returns:
+            dict: mapping from each word to its query result.
+        """
+        queried.extend(words)
+        return query_many(self, words)
+
+    monkeypatch.setattr(ECDICTConnector, "query_many", _query_many)
+
+    async def _query():
+        """Query the same words concurrently.
+
+        Returns:
+            list: results of concurrent queries.
+        """
+        async with AsyncECDICTConnector() as connector:
+            return await asyncio.gather(
+                *(connector.query("play") for _ in range(10)),
+                connector.query_many(["play", "apple"]),
+            )
+
+    res = asyncio.run(_query())
+    assert sorted(queried) == ["apple", "play"]
+    assert all(r == res[0] for r in res[:10]) and res[0]["word"] == "play"
+
+
+def test_async_query_cancelled(monkeypatch):
+    """Test a cancelled query does not cancel a lookup others wait for.
+
+    Args:
+        monkeypatch (MonkeyPatch): pytest tool to delay lookups.
+    """
+    started = threading.Event()
+    resume = threading.Event()
+    query_many = ECDICTConnector.query_many
+
+    def _query_many(self, words):
+        """Wait before the lookup.
+
+        Args:
+            self (ECDICTConnector): the connector.
+            words (list[str]): the words to be queried.
+
+        Returns:
+            dict: mapping from each word to its query result.
+        """
+        started.set()
+        resume.wait()
+        return query_many(self, words)
+
+    monkeypatch.setattr(ECDICTConnector, "query_many", _query_many)
+
+    async def _query():
+        """Cancel the query that starts the shared lookup.
+
+        Returns:
+            tuple: result of the other query, and words in flight after
+                the only query of a word is cancelled.
+        """
+        async with AsyncECDICTConnector() as connector:
+            owner = asyncio.create_task(connector.query("play"))
+            await asyncio.get_running_loop().run_in_executor(
+                None, started.wait
+            )
+            waiter = asyncio.create_task(connector.query("play"))
+            await asyncio.sleep(0)
+            owner.cancel()
+            await asyncio.sleep(0)
+            resume.set()
+            res = await waiter
+
+            started.clear()
+            resume.clear()
+            alone = asyncio.create_task(connector.query("apple"))
+            await asyncio.get_running_loop().run_in_executor(
+                None, started.wait
+            )
+            alone.cancel()
+            await asyncio.sleep(0)
+            inflight = dict(connector._inflight)
+            resume.set()
+            return owner.cancelled(), res, inflight
+
+    cancelled, res, inflight = asyncio.run(_query())
+    assert cancelled and res["word"] == "play"
+    assert inflight == {}
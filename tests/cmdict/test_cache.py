@@ -0,0 +1,115 @@
+"""Test caches for query results."""
+import sqlite3
+
+import pytest
+
+from cmdict.cache import LRUCache
+from cmdict.cache import MISSING
+from cmdict.cache import PersistentCache
+
+
+def test_lru_cache_eviction():
+    """Test if the least recently used key is evicted."""
+    cache = LRUCache(2)
+    cache.put("apple", 1)
+    cache.put("play", None)
+    assert cache.get("apple") == 1
+    cache.put("level", 3)
+
+    assert cache.get("play") is MISSING
+    assert cache.get("level") == 3
+    assert cache.info() == (2, 1, 1, 2, 2)
+
+
+def test_lru_cache_invalid_size():
+    """Test if a cache without room is rejected."""
+    with pytest.raises(ValueError):
+        LRUCache(0)
+
+
+def test_persistent_cache_eviction(tmp_path):
+    """Test if the least recently used key is evicted from the file.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "cache.db"
+    cache = PersistentCache(p, "v1", 2)
+    cache.put_many({"apple": {"word": "apple"}, "notaword": None})
+    cache.flush()
+    assert cache.get_many(["apple", "play"]) == {"apple": {"word": "apple"}}
+    cache.put_many({"play": {"word": "play"}})
+    cache.flush()
+    assert cache.info() == (1, 1, 1, 2, 2)
+
+    reopened = PersistentCache(p, "v1", 2)
+    assert reopened.get_many(["apple", "notaword", "play"]) == {
+        "apple": {"word": "apple"},
+        "play": {"word": "play"},
+    }
+
+
+def test_persistent_cache_new_fingerprint(tmp_path):
+    """Test if cached values are dropped for a new fingerprint.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "cache.db"
+    cache = PersistentCache(p, "v1", 2)
+    cache.put_many({"notaword": None})
+    cache.close()
+    assert PersistentCache(p, "v1", 2).get_many(["notaword"]) == {
+        "notaword": None
+    }
+    assert PersistentCache(p, "v2", 2).get_many(["notaword"]) == {}
+
+
+def test_persistent_cache_touched_in_batch(tmp_path):
+    """Test if values and hits are written to the file in batches.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "cache.db"
+
+    def used():
+        with sqlite3.connect(p) as conn:
+            return dict(conn.execute("select key, used from entries"))
+
+    cache = PersistentCache(p, "v1", 2)
+    cache.put_many({"apple": None, "play": None})
+    assert cache.get_many(["apple"]) == {"apple": None}
+    assert used() == {}
+
+    cache.flush()
+    assert used() == {"apple": 2, "play": 2}
+    assert cache.get_many(["apple"]) == {"apple": None}
+    assert used() == {"apple": 2, "play": 2}
+
+    cache.close()
+    assert used() == {"apple": 3, "play": 2}
+
+
+def test_persistent_cache_written_when_full(tmp_path, monkeypatch):
+    """Test if buffered values are written once the buffer is full.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+        monkeypatch (MonkeyPatch): pytest tool to shrink the buffer.
+    """
+    monkeypatch.setattr("cmdict.cache._FLUSH_SIZE", 2)
+    p = tmp_path / "cache.db"
+    cache = PersistentCache(p, "v1", 10)
+    cache.put_many({"apple": None})
+    assert PersistentCache(p, "v1", 10).info().currsize == 0
+    cache.put_many({"apple": 1, "play": None})
+    assert PersistentCache(p, "v1", 10).info().currsize == 2
+
+    # keys already in the file are not counted again
+    cache.put_many({"apple": 2, "level": None})
+    assert cache.info().currsize == 3
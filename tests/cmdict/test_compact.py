@@ -0,0 +1,112 @@
+"""Test compact dictionary file."""
+import multiprocessing
+
+import pytest
+
+from cmdict.compact import CompactConnector
+from cmdict.compact import compile_db
+from cmdict.ecdict_connector import _PATH
+from cmdict.ecdict_connector import ECDICTConnector
+from cmdict.utils import fingerprint
+
+
+@pytest.fixture
+def cdb_path(tmp_path):
+    """Compile the test database into a compact file.
+
+    Args:
+        tmp_path (Path): pytest temporary directory.
+
+    Returns:
+        Path: path to the compact file.
+    """
+    path = tmp_path / "stardict.cdb"
+    compile_db(_PATH, path)
+    return path
+
+
+def _query_in_process(path):
+    """Query a word from the compact file in another process.
+
+    Args:
+        path (Path): path to the compact file.
+
+    Returns:
+        dict: the query result.
+    """
+    return dict(CompactConnector(path).query("play"))
+
+
+def test_compact_same_as_database(cdb_path, monkeypatch):
+    """Test all words have the same query results as the database.
+
+    Args:
+        cdb_path (Path): path to the compact file.
+        monkeypatch (MonkeyPatch): pytest tool to disable history.
+    """
+    monkeypatch.setattr("cmdict.compact._HISTORY", False)
+    monkeypatch.setattr("cmdict.ecdict_connector._HISTORY", False)
+    db_engine = ECDICTConnector()
+    with db_engine._connection() as conn:
+        words = [w for (w,) in conn.execute("select word from stardict")]
+    words += [w.upper() for w in words] + ["notaword", ""]
+
+    expected = db_engine.query_many(words)
+    res = CompactConnector(cdb_path).query_many(words)
+    assert list(res) == list(expected)
+    assert {k: v and dict(v) for k, v in res.items()} == expected
+
+    fields = ["trans", "bnc"]
+    expected = db_engine.query_many(words, fields=fields)
+    res = CompactConnector(cdb_path).query_many(words, fields=fields)
+    assert {k: v and dict(v) for k, v in res.items()} == expected
+
+
+def test_compact_source(cdb_path):
+    """Test the compact file knows which database it is compiled from.
+
+    Args:
+        cdb_path (Path): path to the compact file.
+    """
+    assert CompactConnector(cdb_path).source == fingerprint(_PATH)
+
+
+def test_compact_shared_by_processes(cdb_path):
+    """Test the compact file can be opened by several processes.
+
+    Args:
+        cdb_path (Path): path to the compact file.
+    """
+    with multiprocessing.get_context("spawn").Pool(2) as pool:
+        res = pool.map(_query_in_process, [cdb_path] * 2)
+    assert res == [ECDICTConnector().query("play")] * 2
+
+
+def test_invalid_compact_file(tmp_path):
+    """Test missing or invalid compact files are rejected.
+
+    Args:
+        tmp_path (Path): pytest temporary directory.
+    """
+    with pytest.raises(ValueError):
+        _ = CompactConnector(tmp_path / "no_such_file.cdb")
+
+    path = tmp_path / "invalid.cdb"
+    path.write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        _ = CompactConnector(path)
+
+
+def test_compile_failure_keeps_file(cdb_path, monkeypatch):
+    """Test a failed compilation leaves the compact file as it was.
+
+    Args:
+        cdb_path (Path): path to the compact file.
+        monkeypatch (MonkeyPatch): pytest tool to limit the offsets.
+    """
+    content = cdb_path.read_bytes()
+    monkeypatch.setattr("cmdict.compact._MAX_OFFSET", 100)
+    with pytest.raises(ValueError, match="too large"):
+        compile_db(_PATH, cdb_path)
+    assert cdb_path.read_bytes() == content
+    assert list(cdb_path.parent.iterdir()) == [cdb_path]
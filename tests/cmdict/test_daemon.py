@@ -0,0 +1,90 @@
+"""Test the query daemon and its client."""
+import threading
+
+import pytest
+
+from cmdict.daemon import Client
+from cmdict.daemon import DAEMON_FEATURES
+from cmdict.daemon import make_server
+from cmdict.daemon import query_many
+from cmdict.ecdict_connector import ECDICTConnector
+
+pytestmark = pytest.mark.skipif(
+    not DAEMON_FEATURES, reason="Unix domain sockets are not supported."
+)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    """Serve queries in a thread on a temporary socket.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+
+    Yields:
+        str: path to the socket.
+    """
+    p = str(tmp_path / "cmdict.sock")
+    server = make_server(ECDICTConnector(), p)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield p
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_daemon_query(socket_path):
+    """Test results from the daemon are the same as in process.
+
+    Args:
+        socket_path (str): path to the socket of a running daemon.
+    """
+    words = ["play", "notaword", "Apple", "play"]
+    assert query_many(words, socket_path) == ECDICTConnector().query_many(
+        words
+    )
+    res = query_many(words, socket_path, fields=["frq"])
+    assert res == ECDICTConnector().query_many(words, fields=["frq"])
+    assert list(res["play"]) == ["word", "frq"]
+
+
+def test_daemon_client_reused(socket_path):
+    """Test one client connection answers several queries.
+
+    Args:
+        socket_path (str): path to the socket of a running daemon.
+    """
+    with Client(socket_path) as client:
+        first = client.query_many(["play"])
+        sock = client._socket
+        assert client.query_many(["apple"])["apple"]["word"] == "apple"
+        assert client._socket is sock and first["play"]["word"] == "play"
+    assert client._socket is None
+
+
+def test_daemon_already_running(socket_path):
+    """Test another daemon can not be bound to the same socket.
+
+    Args:
+        socket_path (str): path to the socket of a running daemon.
+    """
+    with pytest.raises(RuntimeError):
+        make_server(ECDICTConnector(), socket_path)
+
+
+def test_daemon_not_running(tmp_path):
+    """Test the client returns None without a running daemon.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "cmdict.sock"
+    assert query_many(["play"], str(p)) is None
+
+    # a socket left by a daemon that has stopped
+    make_server(ECDICTConnector(), str(p)).server_close()
+    assert p.exists() and query_many(["play"], str(p)) is None
+    make_server(ECDICTConnector(), str(p)).server_close()
@@ -0,0 +1,211 @@
+"""Test resumable download of the database."""
+import hashlib
+import http.server
+import io
+import json
+import threading
+import zipfile
+
+import pytest
+
+from cmdict.downloader import download
+from cmdict.ecdict_connector import _PATH
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """Serve the zip file with Range, dropping the first connection."""
+
+    def do_HEAD(self):  # noqa: N802
+        """Answer headers of the zip file."""
+        self._send_headers(200, len(self.server.data))
+
+    def do_GET(self):  # noqa: N802
+        """Answer the zip file or a range of it."""
+        data = self.server.data
+        start, stop = 0, len(data)
+        header = self.headers.get("Range")
+        if header and self.server.ranges:
+            first, _, last = header.replace("bytes=", "").partition("-")
+            start, stop = int(first), int(last or len(data) - 1) + 1
+            self._send_headers(206, stop - start)
+        else:
+            self._send_headers(200, len(data))
+        self.server.requests.append(header)
+
+        if self.server.drop:
+            # send a part of the body, and drop the connection
+            self.server.drop = False
+            stop = start + 1000
+            self.wfile.write(data[start:stop])
+            self.close_connection = True
+            return
+        self.wfile.write(data[start:stop])
+
+    def _send_headers(self, code, length):
+        """Send headers of a response.
+
+        Args:
+            code (int): status code.
+            length (int): length of the body.
+        """
+        self.send_response(code)
+        self.send_header("Content-Length", str(length))
+        if self.server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+    def log_message(self, *args):
+        """Keep the test output quiet.
+
+        Args:
+            *args: message and its arguments.
+        """
+
+
+class _Unseekable(io.RawIOBase):
+    """File that can not seek, so zip members have data descriptors."""
+
+    def __init__(self):
+        """Initialize the file."""
+        self.data = bytearray()
+
+    def writable(self):
+        """Return if the file is writable.
+
+        Returns:
+            bool: always True.
+        """
+        return True
+
+    def write(self, b):
+        """Write bytes.
+
+        Args:
+            b (bytes): the bytes.
+
+        Returns:
+            int: number of bytes written.
+        """
+        self.data += b
+        return len(b)
+
+
+def _make_zip(seekable=True):
+    """Zip the test database after another member.
+
+    Args:
+        seekable (bool): if the zip file is written to a seekable file,
+            or its members have data descriptors otherwise.
+
+    Returns:
+        bytes: the zip file.
+    """
+    f = io.BytesIO() if seekable else _Unseekable()
+    with zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("README.txt", "ECDICT " * 1000)
+        zf.write(_PATH, "ecdict/stardict.db")
+    return f.getvalue() if seekable else bytes(f.data)
+
+
+@pytest.fixture
+def server():
+    """Run a HTTP server in a thread.
+
+    Yields:
+        http.server.HTTPServer: the server, whose response is set by
+            attributes ``data``, ``ranges`` and ``drop``.
+    """
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.data = _make_zip()
+    httpd.ranges = True
+    httpd.drop = False
+    httpd.requests = []
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}/stardict.zip"
+    thread = threading.Thread(
+        target=httpd.serve_forever, args=(0.05,), daemon=True
+    )
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.parametrize("seekable", [True, False])
+def test_download_streaming(server, tmp_path, seekable):
+    """Test the database is inflated while the zip file is streamed.
+
+    Args:
+        server (http.server.HTTPServer): local HTTP server.
+        tmp_path (pathlib.Path): pytest temporary directory.
+        seekable (bool): if members of the zip file have no data
+            descriptors.
+    """
+    server.data = _make_zip(seekable)
+    sha256 = hashlib.sha256(server.data).hexdigest()
+    progress = []
+
+    p = tmp_path / "stardict.db"
+    download(
+        server.url, p, sha256=sha256, progress=lambda *a: progress.append(a)
+    )
+    assert p.read_bytes() == _PATH.read_bytes()
+    assert progress[-1] == (len(server.data), len(server.data))
+    assert sorted(f.name for f in tmp_path.iterdir()) == ["stardict.db"]
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_download_resumed(server, tmp_path, monkeypatch, ranges):
+    """Test a dropped connection is resumed after received bytes.
+
+    Args:
+        server (http.server.HTTPServer): local HTTP server.
+        tmp_path (pathlib.Path): pytest temporary directory.
+        monkeypatch (MonkeyPatch): pytest tool to shrink the buffer.
+        ranges (bool): if the server supports Range requests.
+    """
+    monkeypatch.setattr("cmdict.downloader._BUFFER_SIZE", 256)
+    server.ranges = ranges
+    server.drop = True
+
+    p = tmp_path / "stardict.db"
+    download(server.url, p)
+    assert p.read_bytes() == _PATH.read_bytes()
+    # 3 full chunks are received before the connection is dropped
+    assert server.requests == [None, "bytes=768-"]
+
+
+def test_download_checksum_mismatch(server, tmp_path):
+    """Test nothing is left, when the checksum does not match.
+
+    Args:
+        server (http.server.HTTPServer): local HTTP server.
+        tmp_path (pathlib.Path): pytest temporary directory.
+    """
+    with pytest.raises(ValueError):
+        download(server.url, tmp_path / "stardict.db", sha256="0" * 64)
+    assert not list(tmp_path.iterdir())
+
+
+def test_download_parallel_ranges(server, tmp_path, monkeypatch):
+    """Test ranges are downloaded in parallel, and resumed.
+
+    Args:
+        server (http.server.HTTPServer): local HTTP server.
+        tmp_path (pathlib.Path): pytest temporary directory.
+        monkeypatch (MonkeyPatch): pytest tool to shrink the range size.
+    """
+    monkeypatch.setattr("cmdict.downloader._RANGE_SIZE", 4096)
+    size = len(server.data)
+
+    # a former run finished the first range
+    archive = tmp_path / "stardict.zip"
+    archive.write_bytes(server.data[:4096] + bytes(size - 4096))
+    state = {"url": server.url, "size": size, "done": [0]}
+    (tmp_path / "stardict.zip.json").write_text(json.dumps(state))
+
+    p = tmp_path / "stardict.db"
+    sha256 = hashlib.sha256(server.data).hexdigest()
+    download(server.url, p, sha256=sha256, jobs=3)
+    assert p.read_bytes() == _PATH.read_bytes()
+    assert "bytes=0-4095" not in server.requests
+    assert sorted(f.name for f in tmp_path.iterdir()) == ["stardict.db"]
@@ -1,7 +1,16 @@
 """Test ECDICTConnector."""
+import os
+import shutil
+import sqlite3
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
+from cmdict.ecdict_connector import _PATH
 from cmdict.ecdict_connector import ECDICTConnector
+from cmdict.prepare import prepare
 
 
 def test_no_file_connect():
@@ -13,10 +22,396 @@ def test_no_file_connect():
 def test_word_query():
     """Test single word query."""
     res = ECDICTConnector().query("play")
-    assert isinstance(res, dict) and len(res) > 0
+    assert isinstance(res, Mapping) and len(res) > 0
 
 
 def test_non_exist_word_search():
     """Test non-exist word query."""
     res = ECDICTConnector().query("notaword")
     assert res is None
+
+
+def test_words_query_many():
+    """Test batched query keeps input order and removes duplicates."""
+    res = ECDICTConnector().query_many(["play", "notaword", "Apple", "play"])
+    assert list(res) == ["play", "notaword", "Apple"]
+    assert res["play"] == ECDICTConnector().query("play")
+    assert res["Apple"]["word"] == "apple"
+    assert res["notaword"] is None
+
+
+def test_words_query_many_in_chunks(monkeypatch):
+    """Test batched query across several chunks.
+
+    Args:
+        monkeypatch (MonkeyPatch): pytest tool to shrink the chunk size.
+    """
+    monkeypatch.setattr("cmdict.ecdict_connector._CHUNK_SIZE", 2)
+    words = ["apple", "play", "level", "notaword", "method"]
+    res = ECDICTConnector().query_many(words)
+    assert list(res) == words
+    assert all(res[w]["word"] == w for w in words if w != "notaword")
+
+
+def test_query_cache(monkeypatch):
+    """Test query results are cached, including words not found.
+
+    Args:
+        monkeypatch (MonkeyPatch): pytest tool to record history.
+    """
+    recorded = []
+
+    class _Store:
+        """History store recording every query."""
+
+        record = recorded.append
+        record_many = recorded.extend
+
+    monkeypatch.setattr("cmdict.ecdict_connector._HISTORY", True)
+    monkeypatch.setattr("cmdict.ecdict_connector.get_store", _Store)
+
+    connector = ECDICTConnector(cache_size=2)
+    assert connector.query("play") == connector.query("play")
+    assert connector.query("notaword") is None
+    assert connector.query("notaword") is None
+    assert connector.cache_info() == (2, 2, 0, 2, 2)
+    assert recorded == ["play", "play", "notaword", "notaword"]
+
+    connector.query_many(["apple", "play"])
+    assert connector.cache_info().evictions == 1
+    assert recorded[-2:] == ["apple", "play"]
+    assert ECDICTConnector().cache_info() is None
+
+
+def test_query_persistent_cache(tmp_path):
+    """Test query results are reused by another connector.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "stardict.db"
+    shutil.copy(_PATH, p)
+
+    connector = ECDICTConnector(p, persistent_cache=True)
+    expected = connector.query_many(["play", "notaword"])
+    assert (tmp_path / ".stardict.cache.db").is_file()
+    # buffered results are written when the connector is closed
+    connector.close()
+
+    connector = ECDICTConnector(p, persistent_cache=True)
+    assert connector.query_many(["play", "notaword"]) == expected
+    assert connector.query("play") == expected["play"]
+    assert connector.cache_info(persistent=True)[:3] == (3, 0, 0)
+
+    # the cache is dropped, when the database is modified
+    os.utime(p, ns=(0, 0))
+    connector = ECDICTConnector(p, persistent_cache=True)
+    assert connector.query("play") == expected["play"]
+    assert connector.cache_info(persistent=True)[:2] == (0, 1)
+
+
+def test_query_fields(tmp_path):
+    """Test only requested fields are fetched, and cached apart.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "stardict.db"
+    shutil.copy(_PATH, p)
+
+    connector = ECDICTConnector(p, cache_size=10, persistent_cache=True)
+    full = connector.query("play")
+    res = connector.query_many(["play", "notaword"], fields=["trans", "frq"])
+    assert list(res["play"]) == ["word", "trans", "frq"]
+    assert dict(res["play"]) == {k: full[k] for k in ("word", "trans", "frq")}
+    assert res["notaword"] is None
+    assert connector.query("play") == full
+    assert connector.query("PLAY", True, ["frq"]) == {
+        "word": "play",
+        "frq": full["frq"],
+    }
+    connector.close()
+
+    connector = ECDICTConnector(p, persistent_cache=True)
+    assert connector.query("play", fields=("frq", "trans")) == res["play"]
+    assert connector.cache_info(persistent=True)[:2] == (1, 0)
+
+    with pytest.raises(ValueError):
+        connector.query("play", fields=["translation"])
+
+
+def test_query_from_threads(monkeypatch):
+    """Test one connector is shared by threads with pooled connections.
+
+    Args:
+        monkeypatch (MonkeyPatch): pytest tool to shrink the pool.
+    """
+    monkeypatch.setattr("cmdict.ecdict_connector._POOL_SIZE", 2)
+    connector = ECDICTConnector()
+    words = ["play", "apple", "level", "notaword"] * 25
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        res = list(executor.map(connector.query, words))
+
+    assert res == [connector.query(w) for w in words]
+    assert connector._opened <= 2
+
+    # threads that end do not leave connections behind
+    for _ in range(20):
+        thread = threading.Thread(target=connector.query, args=("play",))
+        thread.start()
+        thread.join()
+    assert connector._opened <= 2
+
+    connector.close()
+    assert connector._opened == 0
+    assert connector.query("play")["word"] == "play"
+
+
+def test_invalid_database(tmp_path):
+    """Test a file that is not a database fails when it is opened.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "stardict.db"
+    p.write_bytes(b"not a database" * 100)
+    with pytest.raises(ValueError):
+        ECDICTConnector(p)
+
+
+def test_failed_search(monkeypatch):
+    """Test words are not found if the search fails, except cached ones.
+
+    Args:
+        monkeypatch (MonkeyPatch): pytest tool to fail the search.
+    """
+    connector = ECDICTConnector(cache_size=10)
+    play = connector.query("play")
+
+    def _fail(*args):
+        """Fail the search.
+
+        Args:
+            *args: arguments of the search.
+
+        Raises:
+            Error: always.
+        """
+        raise sqlite3.Error("failed")
+
+    monkeypatch.setattr(ECDICTConnector, "_query_words", _fail)
+    monkeypatch.setattr(
+        "cmdict.ecdict_connector.log_exception", lambda message: None
+    )
+    res = connector.query_many(["play", "apple", "apple"])
+    assert res == {"play": play, "apple": None}
+
+
+def test_read_only_connection():
+    """Test the database can not be modified by the connector."""
+    connector = ECDICTConnector()
+    with pytest.raises(sqlite3.Error):
+        with connector._connection() as conn:
+            conn.execute("delete from stardict")
+
+
+def test_normalized_query():
+    """Test words without an exact match fall back to stripped words."""
+    connector = ECDICTConnector(cache_size=10)
+    words = ["play", "Apple,", "'level'", "notaword!", "..."]
+    assert connector.query_many(words)["Apple,"] is None
+
+    res = connector.query_many(words, normalize=True)
+    assert res["Apple,"]["word"] == "apple"
+    assert res["'level'"]["word"] == "level"
+    assert res["notaword!"] is None and res["..."] is None
+    assert connector.query("Apple,") is None
+    assert connector.query("Apple,", normalize=True) == res["Apple,"]
+
+
+def test_normalized_query_without_index(tmp_path):
+    """Test normalized lookup fails without modifying the database.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "stardict.db"
+    shutil.copy(_PATH, p)
+    with sqlite3.connect(p) as conn:
+        conn.execute("drop index stardict_3")
+    conn.close()
+    content = p.read_bytes()
+
+    connector = ECDICTConnector(p)
+    assert connector.query("play")["word"] == "play"
+    with pytest.raises(ValueError, match="cmdict prepare"):
+        connector.query("Play.", normalize=True)
+    with pytest.raises(ValueError, match="cmdict prepare"):
+        connector.query_many(["play"], normalize=True)
+    assert p.read_bytes() == content
+
+
+def test_lemmatize(tmp_path):
+    """Test inflected forms are resolved to headwords in the database.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "stardict.db"
+    shutil.copy(_PATH, p)
+    words = ["apples", "Levelled", "plays", "play", "combined", "notaword"]
+    expected = ["apple", "level", "play", "play", "combined", "notaword"]
+
+    connector = ECDICTConnector(p)
+    assert list(connector.lemmatize(words).values()) == expected
+    assert (tmp_path / ".stardict.index.db").is_file()
+
+    # the index is rebuilt, when the database is modified
+    os.utime(p, ns=(0, 0))
+    connector = ECDICTConnector(p)
+    assert list(connector.lemmatize(words).values()) == expected
+
+
+def test_lemmatize_headwords(tmp_path):
+    """Test headwords listed as inflections of other headwords are kept.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "stardict.db"
+    shutil.copy(_PATH, p)
+    with sqlite3.connect(p) as conn:
+        conn.executemany(
+            "insert into stardict (word, sw, exchange) values (?, ?, ?)",
+            [
+                ("numb", "numb", "r:number/t:numbest"),
+                ("number", "number", "s:numbers"),
+                ("numbers", "numbers", "0:number/1:s"),
+            ],
+        )
+    conn.close()
+
+    connector = ECDICTConnector(p)
+    res = connector.lemmatize(["number", "numbers", "numbest"])
+    assert list(res.values()) == ["number", "number", "numb"]
+
+
+def test_stale_index_replaced(tmp_path):
+    """Test a stale or broken index file is replaced by a new file.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "stardict.db"
+    shutil.copy(_PATH, p)
+    index_path = tmp_path / ".stardict.index.db"
+    index_path.write_bytes(b"not a database")
+
+    connector = ECDICTConnector(p)
+    assert connector.lemmatize(["plays"]) == {"plays": "play"}
+    inode = index_path.stat().st_ino
+
+    os.utime(p, ns=(0, 0))
+    connector = ECDICTConnector(p)
+    assert connector.lemmatize(["plays"]) == {"plays": "play"}
+    assert index_path.stat().st_ino != inode
+    assert sorted(f.name for f in tmp_path.iterdir()) == [
+        ".stardict.index.db",
+        "stardict.db",
+    ]
+
+
+def test_suggest(tmp_path):
+    """Test headwords within an edit distance are suggested.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "stardict.db"
+    shutil.copy(_PATH, p)
+
+    connector = ECDICTConnector(p)
+    assert connector.suggest("Plya") == ["play"]
+    assert connector.suggest("methdo") == ["method"]
+    assert connector.suggest("producton", max_distance=1) == ["production"]
+    assert connector.suggest("pla", limit=0) == []
+    # no trigram is shared with "play"
+    assert connector.suggest("qlxy") == ["play"]
+    assert connector.suggest("xyz") == []
+
+
+def test_complete(tmp_path):
+    """Test prefixes are completed into headwords ranked by frequency.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "stardict.db"
+    shutil.copy(_PATH, p)
+
+    # headwords are in alphabetical order, before the table is prepared
+    connector = ECDICTConnector(p)
+    assert connector.complete("p") == [
+        "play",
+        "predicate",
+        "producer",
+        "production",
+    ]
+    assert not connector.index.built("ranked")
+
+    prepare(p)
+    connector = ECDICTConnector(p)
+    assert connector.complete("p") == [
+        "play",
+        "production",
+        "producer",
+        "predicate",
+    ]
+    assert connector.complete("PRO", limit=1) == ["production"]
+    assert connector.complete("e") == ["ensure", "exclamation", "efforts"]
+    assert connector.complete("zz") == connector.complete("") == []
+
+
+def test_reverse(tmp_path, monkeypatch):
+    """Test headwords are searched by their translations or definitions.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+        monkeypatch (MonkeyPatch): pytest tool to shrink the batch size.
+    """
+    p = tmp_path / "stardict.db"
+    shutil.copy(_PATH, p)
+    monkeypatch.setattr("cmdict.reverse._BATCH_SIZE", 8)
+
+    def _interrupt(n):
+        """Interrupt building the index after the first batch.
+
+        Args:
+            n (int): number of headwords indexed in a batch.
+
+        Raises:
+            KeyboardInterrupt: always.
+        """
+        raise KeyboardInterrupt
+
+    connector = ECDICTConnector(p)
+    with pytest.raises(KeyboardInterrupt):
+        connector.reverse("苹果", progress=_interrupt)
+
+    # the build resumes after the first batch, and is done only once
+    batches = []
+    assert connector.reverse("苹果", progress=batches.append) == ["apple"]
+    assert connector.reverse("结合", progress=batches.append) == ["combined"]
+    assert batches == [8, 5]
+    assert connector.reverse("Fruit") == ["apple"]
+    assert connector.reverse('"') == connector.reverse("notaword") == []
@@ -0,0 +1,28 @@
+"""Test typo tolerant suggestions."""
+from cmdict.fuzzy import _edits
+from cmdict.fuzzy import _grams
+from cmdict.fuzzy import levenshtein
+
+
+def test_levenshtein():
+    """Test edit distances, with early stop beyond the maximum."""
+    assert levenshtein("play", "play") == 0
+    assert levenshtein("plya", "play") == 2
+    assert levenshtein("kitten", "sitting") == 3
+    assert levenshtein("kitten", "sitting", max_distance=1) == 2
+    assert levenshtein("", "abc") == 3
+
+
+def test_grams():
+    """Test words are split into padded trigrams in lowercase."""
+    assert _grams("Play") == ["^^p", "^pl", "pla", "lay", "ay$"]
+    assert _grams("") == ["^^$"]
+
+
+def test_edits():
+    """Test strings within an edit distance are generated."""
+    assert _edits("ab", 0) == {"ab"}
+    edits = _edits("ab", 1)
+    assert {"ab", "b", "xab", "axb", "abx", "xb", "ba"} - edits == {"ba"}
+    assert "ba" in _edits("ab", 2)
+    assert all(len(w) <= 4 for w in _edits("ab", 2))
@@ -10,6 +10,7 @@ import pathlib
 import pytest
 import yaml
 
+from cmdict.history import HistoryStore
 from cmdict.history import record
 
 
@@ -110,6 +111,62 @@ def test_record_no_content(path2yaml_touched):
     assert _read_yaml(p) == ["apple"]
 
 
+def test_store_buffered_flush(tmp_path):
+    """If the store buffers words and appends them in batches.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = str(tmp_path / ".history.yaml")
+    store = HistoryStore(p, buffer_size=2)
+
+    store.record("apple")
+    assert not pathlib.Path(p).is_file(), "The word should be buffered."
+
+    store.record_many(["apple", "banana", "cherry"])
+    assert _read_yaml(p) == ["apple", "banana", "cherry"]
+
+    store.record("durian")
+    store.flush()
+    assert _read_yaml(p) == store.words()
+    assert store.words() == ["apple", "banana", "cherry", "durian"]
+
+
+def test_store_parse_once(tmp_path, monkeypatch):
+    """If the yaml file is parsed only once for repeated records.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+        monkeypatch (MonkeyPatch): pytest tool to count yaml parsing.
+    """
+    p = str(tmp_path / ".history.yaml")
+    record("banana", p)
+
+    calls = []
+    safe_load = yaml.safe_load
+    monkeypatch.setattr(
+        yaml, "safe_load", lambda f: calls.append(f) or safe_load(f)
+    )
+
+    store = HistoryStore(p)
+    for word in ["apple", "banana"] * 100:
+        store.record(word)
+    store.flush()
+
+    assert len(calls) == 1
+    assert _read_yaml(p) == ["banana", "apple"]
+
+
+def test_store_invalid_path():
+    """If a path not to a yaml file is rejected."""
+    with pytest.raises(ValueError):
+        HistoryStore("history.txt")
+    with pytest.raises(ValueError):
+        record("play", "history.txt")
+
+
 def _read_yaml(path):
     """Read the yaml file and return content in a list.
 
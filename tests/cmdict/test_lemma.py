@@ -0,0 +1,14 @@
+"""Test index of inflected forms."""
+from cmdict.lemma import _parse_exchange
+
+
+def test_parse_exchange():
+    """Test inflections and lemmas are parsed from ``exchange``."""
+    assert list(_parse_exchange("play", "i:playing/p:played/s:")) == [
+        ("playing", "play", 1),
+        ("played", "play", 1),
+    ]
+    assert list(_parse_exchange("combined", "0:combine/1:dp")) == [
+        ("combined", "combine", 0)
+    ]
+    assert list(_parse_exchange("level", "s:Level/x:levels")) == []
@@ -1,8 +1,11 @@
 """Test functions for extracting highlights in PDF files."""
 from cmdict.pdf_tools import _check_contain
+from cmdict.pdf_tools import _extract_in_worker
 from cmdict.pdf_tools import _fix_hyphen_broken
 from cmdict.pdf_tools import _get_color_name
+from cmdict.pdf_tools import _WordGrid
 from cmdict.pdf_tools import extract_words
+from cmdict.pdf_tools import extract_words_from_paths
 
 
 def test_get_color_name_func():
@@ -45,6 +48,20 @@ def test_check_contain_func():
     assert _check_contain(rect3, rect4, threshold=0.5)
 
 
+def test_word_grid_search():
+    """Test class _WordGrid only returns contained words in order."""
+    word_blocks = [
+        (40, 10, 60, 20, "second"),
+        (10, 10, 30, 20, "first"),
+        (10, 30, 30, 40, "third"),
+        (500, 500, 520, 510, "far"),
+    ]
+    grid = _WordGrid(word_blocks, cell_size=16)
+    assert [w[4] for w in grid.search((5, 5, 65, 25))] == ["first", "second"]
+    assert [w[4] for w in grid.search((5, 5, 35, 45))] == ["first", "third"]
+    assert grid.search((200, 200, 300, 300)) == []
+
+
 def test_fix_hyphen_broken_func():
     """Test function _fix_hyphen_broken."""
     res = _fix_hyphen_broken(
@@ -68,3 +85,30 @@ def test_fix_hyphen_broken_func():
         "based",
         "networks",
     ]
+
+
+def test_extract_words_from_paths_func():
+    """Test function extract_words_from_paths in a process pool."""
+    for color in ("green", "pink", "purple"):
+        serial = extract_words("./tests/sample-1.pdf", color) | extract_words(
+            "./tests/sample-2.pdf", color
+        )
+        assert extract_words_from_paths(["./tests"], color, jobs=2) == serial
+        assert extract_words_from_paths(
+            ["./tests/sample-1.pdf"], color
+        ) == extract_words("./tests/sample-1.pdf", color)
+
+
+def test_extract_in_worker_flushes_history(monkeypatch):
+    """Test workers flush the history before returning words.
+
+    Args:
+        monkeypatch (MonkeyPatch): pytest tool to count flushes.
+    """
+    flushed = []
+    monkeypatch.setattr(
+        "cmdict.pdf_tools.flush_all", lambda: flushed.append(True)
+    )
+    res = _extract_in_worker("./tests/sample-2.pdf", "purple", 0, None)
+    assert res == extract_words("./tests/sample-2.pdf", "purple")
+    assert flushed == [True]
@@ -0,0 +1,56 @@
+"""Test one-time preparation of the database."""
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from cmdict.ecdict_connector import _PATH
+from cmdict.index_db import IndexDB
+from cmdict.prepare import has_index
+from cmdict.prepare import is_prepared
+from cmdict.prepare import prepare
+
+
+def test_prepare(tmp_path):
+    """Test indexes and statistics are created, and a stamp is written.
+
+    Args:
+        tmp_path (pathlib.Path): pytest temporary directory.
+    """
+    p = tmp_path / "stardict.db"
+    shutil.copy(_PATH, p)
+    with sqlite3.connect(p) as conn:
+        for index in ("stardict_2", "stardict_3", "sd_1"):
+            conn.execute(f"drop index {index}")
+        conn.execute("drop table if exists sqlite_stat1")
+    assert not is_prepared(p)
+
+    prepare(p)
+    assert is_prepared(p)
+    with sqlite3.connect(p) as conn:
+        assert has_index(conn, "word") and has_index(conn, "sw")
+        assert conn.execute("select count(*) from sqlite_stat1").fetchone()
+    assert IndexDB(p).built("ranked")
+
+    # the stamp is stale, when the database is modified
+    os.utime(p, ns=(0, 0))
+    assert not is_prepared(p)
+
+
+def test_prepare_invalid_database(tmp_path):
+    """Test databases not of ECDICT are rejected.
+
+    Args:
+        tmp_path (pathlib.Path): pytest temporary directory.
+    """
+    p = tmp_path / "stardict.db"
+    with sqlite3.connect(p) as conn:
+        conn.execute("create table stardict (id integer, word text)")
+    with pytest.raises(ValueError):
+        prepare(p)
+
+    p.write_bytes(b"not a database")
+    with pytest.raises(ValueError):
+        prepare(p)
+    assert not is_prepared(p)
@@ -0,0 +1,105 @@
+"""Test rendering of word search results."""
+import csv
+import io
+import json
+
+import pytest
+
+from cmdict.ecdict_connector import ECDICTConnector
+from cmdict.render import Renderer
+
+
+class _Terminal(io.StringIO):
+    """Text buffer pretending to be a terminal, counting writes."""
+
+    writes = 0
+
+    def isatty(self):
+        """Return if the file is a terminal.
+
+        Returns:
+            bool: always True.
+        """
+        return True
+
+    def write(self, s):
+        """Write text and count the write.
+
+        Args:
+            s (str): the text.
+
+        Returns:
+            int: number of characters written.
+        """
+        self.writes += 1
+        return super().write(s)
+
+
+def test_render_plain_when_not_terminal():
+    """Test no styles are added, when the output is not a terminal."""
+    res = ECDICTConnector().query("play", fields=["phonetic", "trans"])
+    f = io.StringIO()
+    with Renderer(f) as renderer:
+        renderer.item("play", res, count=3)
+        renderer.item("notaword", None, suggestions=["note"])
+        assert f.getvalue() == ""
+
+    assert "\x1b" not in f.getvalue()
+    assert f.getvalue().startswith("--------\nplay\n\n    phonetic: plei\n")
+    assert "    count: 3\n--------\nnotaword can not be found" in f.getvalue()
+    assert f.getvalue().endswith("    Did you mean: note?\n")
+
+
+def test_render_compact_in_chunks(monkeypatch):
+    """Test results in one line each are written in chunks with styles.
+
+    Args:
+        monkeypatch (MonkeyPatch): pytest tool to shrink the buffer.
+    """
+    monkeypatch.setattr("cmdict.render._BUFFER_SIZE", 100)
+    res = ECDICTConnector().query("apple", fields=["phonetic", "trans"])
+    f = _Terminal()
+    with Renderer(f, compact=True) as renderer:
+        for _ in range(10):
+            renderer.item("apple", res)
+        renderer.item("notaword", None)
+
+    lines = f.getvalue().splitlines()
+    assert len(lines) == 11 and 1 < f.writes < 11
+    assert lines[0].startswith("\x1b[36m\x1b[1mapple\x1b[0m [")
+    assert lines[-1].endswith("notaword\x1b[0m -")
+    assert all(line.count("\x1b[0m") == 1 for line in lines)
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "tsv", "csv"])
+def test_render_records(fmt):
+    """Test each result is rendered as a record of selected fields.
+
+    Args:
+        fmt (str): format of records.
+    """
+    fields = ["trans", "frq"]
+    res = ECDICTConnector().query_many(["play", "notaword"], fields=fields)
+    f = _Terminal()
+    with Renderer(f, fmt=fmt, fields=fields) as renderer:
+        for word in res:
+            renderer.item(word, res[word], count=2)
+
+    text = f.getvalue()
+    assert "\x1b" not in text
+    if fmt == "jsonl":
+        records = [json.loads(line) for line in text.splitlines()]
+    elif fmt == "tsv":
+        rows = [line.split("\t") for line in text.splitlines()]
+        records = [dict(zip(rows[0], row)) for row in rows[1:]]
+        assert "\\n" in records[0]["trans"]
+        records[0]["trans"] = records[0]["trans"].replace("\\n", "\n")
+    else:
+        records = list(csv.DictReader(io.StringIO(text)))
+
+    assert len(records) == 2
+    assert list(records[0]) == ["query", "word", "trans", "frq", "count"]
+    assert records[0]["trans"] == res["play"]["trans"]
+    assert str(records[0]["frq"]) == str(res["play"]["frq"])
+    assert records[1]["query"] == "notaword"
+    assert records[1]["word"] in (None, "")
@@ -1,18 +1,27 @@
 """Test functions for seaching in command line."""
 import os
 import pathlib
+import shutil
+import subprocess
+import sys
 
 import yaml
 from click.testing import CliRunner
 
+from cmdict.ecdict_connector import _PATH
 from cmdict.run_script import cli
 from cmdict.run_script import extract
+from cmdict.run_script import reverse_
 from cmdict.run_script import scan
 from cmdict.run_script import search
 
 _path_yaml = os.path.join(
     str(pathlib.Path(__file__).parents[2]), "src/cmdict/data/.extraction.yaml"
 )
+_LAZY_MODULES = ("requests", "tqdm", "yaml", "trogon", "fitz", "loguru")
+"""Modules that must not be imported before a command needs them."""
+_STARTUP_BUDGET_US = 300000
+"""Budget of cumulative microseconds to import ``cmdict`` and its cli."""
 
 
 def test_cli():
@@ -21,6 +30,26 @@ def test_cli():
     assert res.exit_code == 0
 
 
+def test_cli_search_without_database(monkeypatch, tmp_path):
+    """Test cli search warns, when the database is missing or unprepared.
+
+    Args:
+        monkeypatch (MonkeyPatch): pytest tool to move the database.
+        tmp_path (pathlib.Path): pytest temporary directory.
+    """
+    p = tmp_path / "stardict.db"
+    monkeypatch.setattr("cmdict.run_script._db_path", p)
+    res = CliRunner().invoke(search, "play")
+    assert res.exit_code == 0 and "Please download" in res.output
+
+    # an unprepared database is not modified by other commands
+    shutil.copy(_PATH, p)
+    before = p.read_bytes()
+    res = CliRunner().invoke(search, "play")
+    assert res.exit_code == 0 and "`cmdict prepare`" in res.output
+    assert p.read_bytes() == before
+
+
 def test_cli_search():
     """Test cli word search."""
     res = CliRunner().invoke(search, "play")
@@ -104,3 +133,164 @@ def test_cli_scan():
     expected = ["typically", "predicate", "exclamation"]
     res = CliRunner().invoke(scan, sample_txt)
     assert res.exit_code == 0 and all(word in res.output for word in expected)
+
+
+def test_cli_extract_from_pdf_directory_in_parallel():
+    """Test cli extract words from PDF files in a directory in parallel."""
+    res = CliRunner().invoke(extract, ["./tests", "--color=green", "-j", "2"])
+    expected = ["producer", "ensure", "optimal", "production"]
+    assert res.exit_code == 0 and all(word in res.output for word in expected)
+
+
+def test_cli_extract_from_pdf_directory():
+    """Test cli extract words from PDF files in a directory in serial."""
+    res = CliRunner().invoke(extract, ["./tests", "--color=green"])
+    expected = ["producer", "ensure", "optimal", "production"]
+    assert res.exit_code == 0 and all(word in res.output for word in expected)
+
+
+def test_cli_scan_stdin():
+    """Test cli scan words from standard input."""
+    with open("./tests/sample-3.txt", "r") as f:
+        content = f.read()
+    expected = ["typically", "predicate", "exclamation"]
+    res = CliRunner().invoke(scan, "-", input=content)
+    assert res.exit_code == 0 and all(word in res.output for word in expected)
+
+
+def test_cli_scan_unique_sorted_by_rank():
+    """Test cli scan distinct words sorted and filtered by BNC rank."""
+    sample_txt = "./tests/sample-3.txt"
+    res = CliRunner().invoke(
+        scan, [sample_txt, "--sort", "bnc", "--min-bnc", "5000"]
+    )
+    assert res.exit_code == 0
+    assert (
+        "typically" not in res.output and "can not be found" not in res.output
+    )
+    assert res.output.index("exclamation") < res.output.index("predicate")
+    assert res.output.count("count: 1") == 2
+
+
+def test_cli_scan_unique_sorted_by_count(tmp_path):
+    """Test cli scan distinct words sorted by count in the file.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "sample.txt"
+    p.write_text("apple play, play. Play apple play")
+    res = CliRunner().invoke(scan, [str(p), "--sort", "count"])
+    assert res.exit_code == 0
+    assert res.output.index("play") < res.output.index("apple")
+    assert "count: 4" in res.output and "count: 2" in res.output
+
+    res = CliRunner().invoke(scan, [str(p), "--sort", "count", "--compact"])
+    assert res.exit_code == 0
+    lines = res.output.splitlines()
+    assert len(lines) == 2 and "\x1b" not in res.output
+    assert lines[0].startswith("play (4) [") and "游戏" in lines[0]
+
+
+def test_cli_scan_lemma(tmp_path):
+    """Test cli scan counts inflected forms as their headwords.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "sample.txt"
+    p.write_text("apples played Plays levelled Play")
+    res = CliRunner().invoke(scan, [str(p), "--lemma", "--sort", "count"])
+    assert res.exit_code == 0
+    assert "apples" not in res.output and "played" not in res.output
+    assert "Play" not in res.output
+    assert res.output.index("play") < res.output.index("apple")
+    assert "count: 3" in res.output
+
+    res = CliRunner().invoke(search, ["Levelled", "--lemma"])
+    assert "level" in res.output and "can not be found" not in res.output
+
+
+def test_cli_search_format():
+    """Test cli search echoes records of selected fields."""
+    res = CliRunner().invoke(
+        search, ["play", "notaword", "--format", "jsonl", "--fields", "frq"]
+    )
+    assert res.exit_code == 0
+    assert res.output.splitlines() == [
+        '{"query": "play", "word": "play", "frq": 200}',
+        '{"query": "notaword", "word": null, "frq": null}',
+    ]
+
+    res = CliRunner().invoke(search, ["play", "--fields", "translation"])
+    assert res.exit_code == 2 and "unknown" in res.output
+
+
+def test_cli_search_from_file(monkeypatch):
+    """Test cli search words read from standard input in batches.
+
+    Args:
+        monkeypatch (MonkeyPatch): pytest tool to shrink batches.
+    """
+    monkeypatch.setattr("cmdict.run_script._SCAN_BATCH_SIZE", 2)
+    res = CliRunner().invoke(
+        search,
+        ["apple", "--from-file", "-", "--format", "tsv", "--fields", "frq"],
+        input="play\n\na lot\nnotaword\nplay\n",
+    )
+    assert res.exit_code == 0
+    queries = [line.split("\t")[0] for line in res.output.splitlines()]
+    assert queries == ["query", "apple", "play", "a lot", "notaword", "play"]
+    assert res.output.splitlines()[4] == "notaword\t\t"
+
+
+def test_cli_search_suggest():
+    """Test cli suggests similar words for words not found."""
+    res = CliRunner().invoke(search, ["Plya", "--suggest"])
+    assert res.exit_code == 0 and "Did you mean: play?" in res.output
+
+
+def test_cli_search_shell_completion():
+    """Test shell completion of words for search."""
+    ctx = search.make_context("search", [])
+    words = search.params[0].shell_complete(ctx, "produ")
+    assert [w.value for w in words] == ["production", "producer"]
+
+
+def test_cli_reverse():
+    """Test cli searches English words by a Chinese or English phrase."""
+    res = CliRunner().invoke(reverse_, ["苹果"])
+    assert res.exit_code == 0 and "apple" in res.output
+
+    res = CliRunner().invoke(reverse_, ["确定", "保证"])
+    assert res.exit_code == 0 and "ensure" in res.output
+
+    res = CliRunner().invoke(reverse_, ["notaword"])
+    assert res.exit_code == 0 and "can not be found" in res.output
+
+
+def test_cli_startup_imports():
+    """Test cold start of cli does not import heavy dependencies."""
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import cmdict"],
+        env={
+            **os.environ,
+            "PYTHONPATH": str(pathlib.Path(__file__).parents[2] / "src"),
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # lines look like "import time: self [us] | cumulative | name"
+    cumulative = {}
+    for line in res.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, total, name = line.split("|")
+            if total.strip().isdigit():
+                cumulative[name.strip()] = int(total)
+
+    assert not [m for m in _LAZY_MODULES if m in cumulative]
+    assert cumulative["cmdict"] < _STARTUP_BUDGET_US
@@ -0,0 +1,53 @@
+"""Test functions to split text into words.
+
+The benchmark compares the throughput of building the translation
+table on every call, as ``remove_punctuation`` used to do, with the
+precompiled table. Run ``pytest -s`` to see tokens per second. Only
+the results are asserted, since timings vary between machines.
+"""
+import string
+import timeit
+
+from cmdict.tokenizer import remove_punctuation
+from cmdict.tokenizer import SPECIAL_CHARS
+from cmdict.tokenizer import tokenize
+
+
+def test_remove_unicode_punctuation():
+    """Test if Unicode punctuation beyond ``SPECIAL_CHARS`` is removed."""
+    assert remove_punctuation("“quote”") == "quote"
+    assert remove_punctuation("don’t…") == "dont"
+    assert remove_punctuation("«café»") == "café"
+    assert remove_punctuation("你好，世界。") == "你好世界"
+
+
+def test_tokenize():
+    """Test if tokens that are only punctuation are dropped."""
+    assert tokenize("Hello, world -- “again”!\n") == [
+        "Hello",
+        "world",
+        "again",
+    ]
+
+
+def test_tokenize_benchmark():
+    """Compare tokens per second before and after precompiling."""
+    with open("tests/sample-3.txt", "r") as f:
+        text = f.read() * 1000
+    tokens = text.split()
+
+    def legacy():
+        table = string.punctuation + SPECIAL_CHARS
+        return [w.translate(str.maketrans("", "", table)) for w in tokens]
+
+    def single():
+        return [remove_punctuation(w) for w in tokens]
+
+    def bulk():
+        return tokenize(text)
+
+    assert legacy() == single() == bulk()
+
+    for f in (legacy, single, bulk):
+        seconds = min(timeit.repeat(f, number=1, repeat=3))
+        print(f"{f.__name__}: {len(tokens) / seconds:,.0f} tokens/sec")
@@ -1,4 +1,11 @@
 """Test functions for txt files."""
+import bz2
+import gzip
+
+from cmdict.tokenizer import tokenize
+from cmdict.txt_tools import count_words
+from cmdict.txt_tools import iter_lines
+from cmdict.txt_tools import iter_words
 from cmdict.txt_tools import scan_words
 
 
@@ -7,3 +14,73 @@ def test_scan_words():
     words = scan_words("tests/sample-3.txt")
     expected = ["typically", "predicate", "exclamation"]
     assert all(word in words for word in expected)
+
+
+def test_iter_words_across_chunks():
+    """Test if words split by the end of a chunk are joined."""
+    words = list(iter_words("tests/sample-3.txt", chunk_size=7))
+    assert words == scan_words("tests/sample-3.txt")
+
+
+def test_iter_words_punctuation_at_chunk_end(tmp_path):
+    """Test if words are the same as splitting the text at once.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "sample.txt"
+    text = "say “hello there” now, “ok” play .it e.g."
+    p.write_text(text, encoding="utf-8")
+    expected = ["say", "hello", "there", "now", "ok", "play", "it", "eg"]
+    assert tokenize(text) == expected
+    for chunk_size in range(1, len(text) + 1):
+        assert list(iter_words(str(p), chunk_size=chunk_size)) == expected
+
+
+def test_iter_words_compressed(tmp_path):
+    """Test if gzip and bzip2 compressed files are decompressed.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    with open("tests/sample-3.txt", "rb") as f:
+        content = f.read()
+
+    for suffix, module in ((".gz", gzip), (".bz2", bz2)):
+        p = tmp_path / ("sample-3.txt" + suffix)
+        p.write_bytes(module.compress(content))
+        assert list(iter_words(str(p))) == scan_words("tests/sample-3.txt")
+
+
+def test_iter_lines(tmp_path):
+    """Test if words are read by line, skipping blank lines.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "words.txt.gz"
+    p.write_bytes(gzip.compress(b"play\n\n  a lot \r\nplay"))
+    assert list(iter_lines(str(p))) == ["play", "a lot", "play"]
+
+
+def test_count_words():
+    """Test if words are counted in the order of first appearance."""
+    counts = count_words("tests/sample-3.txt")
+    assert list(counts)[:3] == ["a", "set", "of"]
+    assert counts["a"] == 3 and "" not in counts
+
+
+def test_count_words_ignoring_case(tmp_path):
+    """Test if words differing only in case are counted together.
+
+    Args:
+        tmp_path (pathlib.Path): pytest tool to initiate a temporary
+            directory.
+    """
+    p = tmp_path / "sample.txt"
+    p.write_text("Play apple play, PLAY. Apple")
+    assert count_words(str(p)) == {"Play": 3, "apple": 2}
+    assert list(count_words(str(p))) == ["Play", "apple"]
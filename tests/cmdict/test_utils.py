@@ -1,4 +1,5 @@
 """Test utility functions."""
+from cmdict.utils import batched
 from cmdict.utils import remove_punctuation
 
 
@@ -6,3 +7,9 @@ def test_remove_punctuation_func():
     """Test function _remove_punctuation."""
     assert remove_punctuation("other.") == "other"
     assert remove_punctuation("'quote") == "quote"
+
+
+def test_batched_func():
+    """Test function batched."""
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched([], 2)) == []
@@ -0,0 +1,30 @@
+"""Fixtures shared by all tests."""
+import shutil
+
+import pytest
+
+from cmdict.ecdict_connector import _PATH
+from cmdict.prepare import prepare
+
+
+@pytest.fixture(scope="session", autouse=True)
+def prepared_db(tmp_path_factory):
+    """Point the command line to a prepared copy of the test database.
+
+    Preparing writes indexes and statistics, so the database in the
+    repository is copied to keep it unchanged.
+
+    Args:
+        tmp_path_factory (TempPathFactory): pytest tool to initiate a
+            temporary directory for the session.
+
+    Yields:
+        Path: path to the prepared copy.
+    """
+    p = tmp_path_factory.mktemp("data") / "stardict.db"
+    shutil.copy(_PATH, p)
+    prepare(p)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("cmdict.run_script._db_path", p)
+        mp.setattr("cmdict.run_script._cdb_path", p.with_suffix(".cdb"))
+        yield p